@@ -0,0 +1,45 @@
+import re
+import subprocess as sp
+import sys
+from typing import Dict
+
+# NOTE: modules which must only be loaded once the generation starts
+HEAVY_MODULES = ("libcst", "black", "isort", "cattr", "concurrent.futures.process")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def importtime(module: str = "gutt.cli.main", repeat: int = 5) -> Dict:
+    """Measure the import of `module` with "python -X importtime".
+
+    Returns the fastest cumulative time in microseconds of `repeat` runs,
+    the modules imported along with their cumulative time, and the heavy
+    modules which have been pulled in.
+    """
+
+    best = None
+
+    for _ in range(repeat):
+        proc = sp.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            stderr=sp.PIPE,
+            check=True,
+            universal_newlines=True,
+        )
+
+        imported = {}
+        for line in proc.stderr.splitlines():
+            m = _LINE.match(line)
+            if m:
+                imported[m.group(4)] = int(m.group(2))
+
+        if best is None or imported.get(module, 0) < best["total_us"]:
+            best = dict(total_us=imported.get(module, 0), imported=imported)
+
+    best["heavy"] = sorted(
+        name
+        for name in best["imported"]
+        if any(name == h or name.startswith(f"{h}.") for h in HEAVY_MODULES)
+    )
+
+    return best
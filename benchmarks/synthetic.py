@@ -0,0 +1,136 @@
+import json
+import os
+import platform
+import shutil
+import subprocess as sp
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+MODULES_PER_PACKAGE = 50
+
+RUNNER = "import sys; from gutt.cli.main import main; main(sys.argv[1:])"
+
+
+def synthesize(
+    root: str,
+    modules: int,
+    functions: int,
+    classes: int,
+    methods: int,
+    name: str = "synthpkg",
+) -> List[str]:
+    """Write a package with `modules` modules, nested in subpackages of 50."""
+
+    pkgdir = os.path.join(root, name)
+    paths = []
+
+    for i in range(modules):
+        subdir = os.path.join(pkgdir, f"sub{i // MODULES_PER_PACKAGE}")
+        os.makedirs(subdir, exist_ok=True)
+
+        for d in (pkgdir, subdir):
+            open(os.path.join(d, "__init__.py"), "a").close()
+
+        lines = ["import os", ""]
+
+        for j in range(functions):
+            lines += ["", f"def function{j}(a, b=None):", "    return a, b", ""]
+
+        for k in range(classes):
+            lines += ["", f"class Class{k}:"]
+
+            for m in range(methods):
+                lines += [f"    def method{m}(self, x):", "        return x", ""]
+
+            if methods == 0:
+                lines += ["    pass", ""]
+
+        path = os.path.join(subdir, f"module{i}.py")
+        with open(path, "w") as f:
+            f.write("\n".join(lines))
+
+        paths.append(path)
+
+    return paths
+
+
+def append_function(paths: List[str], name: str = "added"):
+    for path in paths:
+        with open(path, "a") as f:
+            f.write(f"\n\ndef {name}():\n    pass\n")
+
+
+def run_gutt(args: List[str], cwd: str) -> Dict:
+    """Run the gutt CLI in a fresh interpreter, return wall time and its report."""
+
+    report_file = os.path.join(cwd, "report.json")
+    cmd = [sys.executable, "-c", RUNNER, *args, "--report", "json"]
+    cmd += ["--report-file", report_file]
+
+    start = time.perf_counter()
+    sp.run(cmd, cwd=cwd, check=True, stdout=sp.DEVNULL)
+    elapsed = time.perf_counter() - start
+
+    with open(report_file, "r") as f:
+        report = json.load(f)
+
+    return dict(
+        wall=round(elapsed, 4),
+        timings=report["timings"],
+        counters=report["counters"],
+    )
+
+
+def benchmark(
+    modules: int = 100,
+    functions: int = 10,
+    classes: int = 5,
+    methods: int = 5,
+    changed: int = 5,
+    repeat: int = 3,
+    extra_args: List[str] = (),
+) -> Dict:
+    """Time cold, no-op and partial-update runs over a synthetic package.
+
+    No-op scenarios are repeated and the fastest run is kept.
+    """
+
+    workdir = tempfile.mkdtemp(prefix="gutt-bench-")
+
+    try:
+        paths = synthesize(workdir, modules, functions, classes, methods)
+        base = ["-m", "synthpkg", "-p", workdir, "-o", "out", *extra_args]
+
+        scenarios = {}
+        scenarios["cold"] = run_gutt(base + ["-i"], workdir)
+        scenarios["noop_incremental"] = min(
+            (run_gutt(base + ["-i"], workdir) for _ in range(repeat)),
+            key=lambda r: r["wall"],
+        )
+        scenarios["noop_full"] = min(
+            (run_gutt(base, workdir) for _ in range(repeat)),
+            key=lambda r: r["wall"],
+        )
+
+        append_function(paths[:changed])
+        scenarios["partial_incremental"] = run_gutt(base + ["-i"], workdir)
+
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return dict(
+        config=dict(
+            modules=modules,
+            functions=functions,
+            classes=classes,
+            methods=methods,
+            changed=changed,
+            repeat=repeat,
+            extra_args=list(extra_args),
+        ),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        scenarios=scenarios,
+    )
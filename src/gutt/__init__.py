@@ -3,4 +3,14 @@ from ._meta import authors, version
 __authors__ = authors
 __version__ = version
 
-__all__ = ["__authors__", "__version__"]
+__all__ = ["__authors__", "__version__", "generate", "generate_batch"]
+
+
+def __getattr__(name: str):
+    # NOTE: the generator pulls in libcst and black, only load it on demand
+    if name in ("generate", "generate_batch"):
+        from . import generator
+
+        return getattr(generator, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,119 @@
+import os
+from typing import Iterable
+from typing import List as LIST
+from typing import Optional, Tuple
+
+from .discovery import Discovery
+from .model import ModuleIO
+
+
+class ChangesError(Exception):
+    pass
+
+
+def git_changed_files(ref: str, cwd: str = None) -> LIST[str]:
+    """Absolute paths of the files changed since `ref`, by "git diff --name-only",
+    and of the untracked files not ignored by git.
+    """
+
+    import subprocess
+
+    def git(*args) -> str:
+        try:
+            return subprocess.run(
+                ("git", *args),
+                cwd=cwd,
+                check=True,
+                capture_output=True,
+                universal_newlines=True,
+            ).stdout
+
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise ChangesError(getattr(e, "stderr", None) or str(e)) from e
+
+    top = git("rev-parse", "--show-toplevel").strip()
+
+    # NOTE: without rename detection, a renamed module shows up as a deleted
+    # file plus an added one
+    out = git("diff", "--name-only", "--no-renames", "-z", ref, "--")
+    # NOTE: brand-new modules are not in the diff until they are added
+    out += git("ls-files", "--others", "--exclude-standard", "--full-name", "-z", ":/")
+
+    return list(dict.fromkeys(os.path.join(top, p) for p in out.split("\0") if p))
+
+
+def read_changed_files(lines: Iterable[str]) -> LIST[str]:
+    """Absolute paths listed one per line, blank lines and "#" comments skipped."""
+
+    return [
+        os.path.abspath(line.strip())
+        for line in lines
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+
+
+def changed_modules(
+    module: ModuleIO,
+    files: Iterable[str],
+    head: str = None,
+    discovery: Optional[Discovery] = None,
+) -> Tuple[LIST[ModuleIO], LIST[ModuleIO]]:
+    """Split the changed files under `module` into modules to generate and
+    modules whose source was deleted while their test file is still there.
+    Files pruned by `discovery` are left out.
+    """
+
+    changed, deleted, seen = [], [], set()
+    top = os.path.dirname(module.src)
+
+    for path in sorted(files):
+        mod = module.submodule(path, head)
+
+        if mod is None or mod.src in seen:
+            continue
+
+        if discovery is not None and module.ispkg and discovery.skipped(mod.src, top):
+            continue
+
+        seen.add(mod.src)
+
+        if os.path.isfile(mod.src):
+            changed.append(mod)
+
+        elif os.path.isfile(mod.dst):
+            deleted.append(mod)
+
+    return changed, deleted
+
+
+def orphaned_tests(module: ModuleIO, head: str = None) -> LIST[ModuleIO]:
+    """Test modules under the output directory of the package `module`
+    whose source module does not exist anymore.
+    """
+
+    if not module.ispkg:
+        return []
+
+    src_dir, dst_dir = os.path.dirname(module.src), os.path.dirname(module.dst)
+    orphans = []
+
+    for dirpath, dirnames, filenames in os.walk(dst_dir):
+        dirnames[:] = sorted(d for d in dirnames if d.isidentifier())
+        rel = os.path.relpath(dirpath, dst_dir)
+
+        for fname in sorted(filenames):
+            if not (fname.startswith("test_") and fname.endswith(".py")):
+                continue
+
+            src = os.path.normpath(os.path.join(src_dir, rel, fname[len("test_") :]))
+
+            mod = module.submodule(src, head)
+
+            if (
+                mod is not None
+                and mod.dst == os.path.join(dirpath, fname)
+                and not os.path.exists(mod.src)
+            ):
+                orphans.append(mod)
+
+    return orphans
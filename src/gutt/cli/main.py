@@ -1,15 +1,40 @@
-import dataclasses
 import os
-import re
-from collections import OrderedDict
+import sys
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+from typing import List as LIST
+from typing import Tuple
 
 import click
-import libcst
-from libcst import ClassDef, FunctionDef, IndentedBlock, Module, SimpleStatementLine
 
-from gutt.model import Code, ModuleIO
-from gutt.template import Template as T
-from gutt.utils import blacking, expand_sys_path, makefile, populate_init
+# NOTE: keep this import list light, libcst and black are only loaded by
+# "gutt.generator" and "gutt.template" once the generation actually starts
+from gutt.changes import (
+    ChangesError,
+    changed_modules,
+    git_changed_files,
+    orphaned_tests,
+    read_changed_files,
+)
+from gutt.discovery import Discovery
+from gutt.filters import QualnameFilter
+from gutt.manifest import MANIFEST_NAME, Manifest
+from gutt.model import Generated, ModuleIO
+from gutt.progress import PROGRESS
+from gutt.rendercache import RENDER_CACHE_NAME, RENDER_CACHE_SIZE, RenderCache
+from gutt.report import REPORTS, RunReport, Stats
+from gutt.utils import (
+    FORMAT_SCOPES,
+    FORMATTERS,
+    WriteQueue,
+    expand_sys_path,
+    makefile,
+    populate_init,
+)
+from gutt.watcher import Watcher
+
+if TYPE_CHECKING:
+    from gutt.generator import Messages
 
 
 class InvalidModule(Exception):
@@ -27,6 +52,83 @@ def print_version(ctx, param, value):
     ctx.exit()
 
 
+def read_modnames(lines: Iterable[str]) -> LIST[str]:
+    """Module names listed one per line, blank lines and "#" comments skipped."""
+
+    return [
+        line.strip()
+        for line in lines
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+
+
+_worker = {}
+
+
+def _init_worker(
+    path: Tuple[str],
+    template_class: str,
+    qfilter: QualnameFilter,
+    formatter: str,
+    format_scope: str = "file",
+    detail: bool = True,
+    stale: str = "keep",
+    render_cache: Optional[RenderCache] = None,
+):
+    for p in path[::-1]:
+        if p and isinstance(p, str):
+            sys.path.insert(0, p)
+
+    _worker.update(
+        template_class=template_class,
+        qfilter=qfilter,
+        formatter=formatter,
+        format_scope=format_scope,
+        detail=detail,
+        stale=stale,
+        render_cache=render_cache,
+    )
+
+
+def _load_template(name: str):
+    from gutt.template import Template
+
+    return Template.load(name)
+
+
+def _worker_template():
+    # NOTE: loaded on first use, a run with nothing to generate never imports libcst
+    if "Template" not in _worker:
+        _worker["Template"] = _load_template(_worker["template_class"])
+
+    return _worker["Template"]
+
+
+def _generate_in_worker(
+    mod: ModuleIO, generated: Tuple[str, ...] = ()
+) -> Tuple[Generated, "Messages", Stats, Dict[str, str]]:
+    from gutt.generator import Messages, generate_module
+
+    echo = Messages(detail=_worker.get("detail", True))
+    stats = Stats()
+    render_cache = _worker.get("render_cache")
+    result = generate_module(
+        mod,
+        _worker_template(),
+        _worker["qfilter"],
+        _worker["formatter"],
+        _worker.get("format_scope", "file"),
+        echo,
+        stale=_worker.get("stale", "keep"),
+        render_cache=render_cache,
+        generated=generated,
+        cache=_worker.get("cache"),
+        stats=stats,
+    )
+
+    return result, echo, stats, render_cache.drain() if render_cache else {}
+
+
 @click.command()
 @click.pass_context
 @click.option(
@@ -38,7 +140,15 @@ def print_version(ctx, param, value):
     is_eager=True,
 )
 @click.option(
-    "--modname", "-m", help="Target module name for generating test templates"
+    "--modname",
+    "-m",
+    multiple=True,
+    help="Target module name for generating test templates, could assign with multiple values",
+)
+@click.option(
+    "--modname-file",
+    type=click.File("r"),
+    help='Read more target module names from this file, one per line, "-" for stdin.',
 )
 @click.option(
     "--path",
@@ -50,7 +160,29 @@ def print_version(ctx, param, value):
 @click.option(
     "--exclude",
     "-e",
-    help="Giving regex pattern to match the implementation to be excluded by its qualname.",
+    multiple=True,
+    help='Regex pattern to exclude implementations by qualname ("glob:" prefix for glob), could assign with multiple values',
+)
+@click.option(
+    "--include",
+    "-I",
+    multiple=True,
+    help="Only generate templates for qualnames matching any of these patterns, same syntax as --exclude.",
+)
+@click.option(
+    "--exclude-dir",
+    multiple=True,
+    help="Gitignore-style pattern of package directories never descended into, could assign with multiple values",
+)
+@click.option(
+    "--max-file-size",
+    type=click.IntRange(min=0),
+    help="Skip modules larger than this many bytes.",
+)
+@click.option(
+    "--no-gitignore",
+    is_flag=True,
+    help='Also discover modules ignored by ".gitignore" files.',
 )
 @click.option(
     "--output",
@@ -75,183 +207,513 @@ def print_version(ctx, param, value):
     is_flag=True,
     help="Flatten the nested structure of the test module to the single folder.",
 )
-def main(ctx, modname, path, exclude, output, template_class, dryrun, flatten):
-    head = "" if flatten else modname.split(".")[0]
-    with expand_sys_path(*path):
-        module: ModuleIO = ModuleIO.from_name(modname, output, head)
-        Template = T.load(template_class)
-
-        if module is None:
-            raise InvalidModule(modname)
-
-        for mod in module.iter_submodules(head):
-            code_added = 0
-
-            if isinstance(exclude, str) and re.search(exclude, mod.name):
-                click.secho("ignoring module: ", nl=False, fg="bright_white")
-                click.secho(mod.name, fg="bright_black")
-                continue
-
-            try:
-                with open(mod.src, "r") as f:
-                    src_mod = libcst.parse_module(f.read())
-
-            except Exception as error:
-                msg = f'{type(error)}: {error}. src: "{mod.src}"'
-                click.secho(msg, fg="bright_yellow")
-                continue
-
-            src_codes = OrderedDict()
-
-            for el in src_mod.body:
-                if not isinstance(el, (FunctionDef, ClassDef)):
-                    continue
-
-                qname = f"{mod.name}.{el.name.value}"
-
-                if isinstance(exclude, str) and re.search(exclude, qname):
-                    click.secho("excluding: ", nl=False, fg="bright_white")
-                    click.secho(qname, fg="bright_black")
-
-                    continue
-
-                src_codes.update({qname: Code(module=mod, cst=el)})
-
-                click.echo("\033[K", nl=False)
-                click.secho("collecting: ", nl=False, fg="bright_white")
-                click.secho(f"{qname}", fg="bright_cyan")
-
-            if len(src_codes) == 0:
-                continue
-
-            try:
-                with open(mod.dst, "r") as f:
-                    test_mod = libcst.parse_module(f.read())
-
-                # NOTE: let module's and class's body mutable
-                test_mod = dataclasses.replace(test_mod, body=list(test_mod.body))
-                for i, stmt in enumerate(test_mod.body):
-                    if isinstance(stmt, ClassDef):
-                        test_mod.body[i] = dataclasses.replace(
-                            stmt,
-                            body=dataclasses.replace(
-                                stmt.body, body=list(stmt.body.body)
-                            ),
-                            # IndentedBlock(body=list(stmt.body.body))
-                        )
+@click.option(
+    "--formatter",
+    "-f",
+    type=click.Choice(FORMATTERS),
+    default="inproc",
+    help='Formatter engine for generated code, "inproc" runs black in-process, default: "inproc".',
+)
+@click.option(
+    "--format-scope",
+    type=click.Choice(FORMAT_SCOPES),
+    default="file",
+    help='Format the whole test module, or only the "fragments" inserted into it, default: "file".',
+)
+@click.option(
+    "--render-cache",
+    "use_render_cache",
+    is_flag=True,
+    help=f'Reuse formatted templates across runs, by template and symbol signature, kept in "<output>/{RENDER_CACHE_NAME}".',
+)
+@click.option(
+    "--render-cache-size",
+    type=click.IntRange(min=0),
+    default=RENDER_CACHE_SIZE,
+    help=f"Evict the least recently used templates beyond this many bytes, default: {RENDER_CACHE_SIZE}.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    help="Number of worker processes for generating modules, 0 for all cores, default: 1.",
+)
+@click.option(
+    "--incremental",
+    "-i",
+    is_flag=True,
+    help=f'Skip modules whose source and test files are unchanged since the last run, tracked in "<output>/{MANIFEST_NAME}".',
+)
+@click.option(
+    "--resolve-imports",
+    is_flag=True,
+    help='Resolve every submodule with "importlib" instead of the package directory layout.',
+)
+@click.option(
+    "--watch",
+    "-w",
+    is_flag=True,
+    help="Keep running and regenerate the test module of each source file once it changes.",
+)
+@click.option(
+    "--watch-interval",
+    type=click.FloatRange(min=0.01),
+    default=0.1,
+    help="Polling interval in seconds for watch mode, default: 0.1.",
+)
+@click.option(
+    "--batch-writes",
+    is_flag=True,
+    help="Queue all test files in memory and write them at the end of the run.",
+)
+@click.option(
+    "--fix-inits",
+    "fix_all_inits",
+    is_flag=True,
+    help='Scan the whole output tree for missing "__init__.py", instead of only directories created in this run.',
+)
+@click.option(
+    "--progress",
+    "progress_mode",
+    type=click.Choice(list(PROGRESS)),
+    default="verbose",
+    help='Progress output, "lines" prints one line per module, "bar" a live progress bar, default: "verbose".',
+)
+@click.option(
+    "--report",
+    "report_format",
+    type=click.Choice(REPORTS),
+    help="Emit a machine-readable report with per-module and aggregated phase timings and counters.",
+)
+@click.option(
+    "--report-stale",
+    is_flag=True,
+    help="List tests, and whole test modules, whose source symbols no longer exist.",
+)
+@click.option(
+    "--prune",
+    is_flag=True,
+    help=f'Remove the stale tests, and test modules, gutt generated as recorded in "<output>/{MANIFEST_NAME}".',
+)
+@click.option(
+    "--serve",
+    is_flag=True,
+    help="Run as a JSON-RPC worker on stdio (or --socket), keeping templates and parsed modules warm.",
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    help="Serve on this Unix socket instead of stdio, used with --serve.",
+)
+@click.option(
+    "--since",
+    metavar="REF",
+    help='Only process modules changed since this git ref, as listed by "git diff --name-only", and untracked ones.',
+)
+@click.option(
+    "--changed-files",
+    type=click.File("r"),
+    help='Only process modules in this list of changed files, one path per line, "-" for stdin.',
+)
+@click.option(
+    "--report-file",
+    help="Write the report to this file instead of the standard output.",
+)
+def main(
+    ctx,
+    modname,
+    modname_file,
+    path,
+    exclude,
+    include,
+    exclude_dir,
+    max_file_size,
+    no_gitignore,
+    output,
+    template_class,
+    dryrun,
+    flatten,
+    formatter,
+    format_scope,
+    use_render_cache,
+    render_cache_size,
+    jobs,
+    incremental,
+    resolve_imports,
+    watch,
+    watch_interval,
+    batch_writes,
+    fix_all_inits,
+    progress_mode,
+    report_format,
+    report_file,
+    since,
+    changed_files,
+    report_stale,
+    prune,
+    serve,
+    socket_path,
+):
+    if serve:
+        with expand_sys_path(*path):
+            from gutt.server import Server
+
+            server = Server(
+                _load_template(template_class),
+                output,
+                qfilter=QualnameFilter(exclude, include),
+                formatter=formatter,
+                format_scope=format_scope,
+                flatten=flatten,
+                dryrun=dryrun,
+            )
+
+            if socket_path:
+                server.serve_unix(socket_path)
+            else:
+                server.serve_stdio()
 
-                click.secho("loading: ", nl=False, fg="bright_white")
-                click.secho(f"{mod.dst}", fg="bright_green")
+        return
 
-            except FileNotFoundError:
-                test_mod = Module(body=[])
+    modnames = list(modname)
 
-            except Exception as error:
-                msg = f'{type(error)}: {error}. dst: "{mod.dst}"'
-                click.secho(msg, fg="bright_yellow")
-                continue
+    if modname_file is not None:
+        modnames.extend(read_modnames(modname_file))
 
-            test_codes = OrderedDict()
+    if not modnames:
+        raise click.UsageError('Missing option "--modname" / "-m".')
 
-            for i, el in enumerate(test_mod.body):
-                if isinstance(el, (ClassDef, FunctionDef)):
-                    test_pfx = (
-                        Template.function_layout.prefix
-                        if isinstance(el, FunctionDef)
-                        else Template.class_layout.prefix
+    jobs = jobs or os.cpu_count() or 1
+    stale_mode = "prune" if prune else "report" if report_stale else "keep"
+    # NOTE: keep stdout parseable when the report is written there
+    progress = PROGRESS[progress_mode](
+        err=report_format is not None and not report_file
+    )
+    with expand_sys_path(*path):
+        report = RunReport()
+
+        with report.total.phase("discovery"):
+            discovery = Discovery(
+                exclude_dirs=exclude_dir,
+                max_file_size=max_file_size,
+                gitignore=not no_gitignore,
+            )
+            roots: LIST[Tuple[ModuleIO, str]] = []
+
+            for name in dict.fromkeys(modnames):
+                head = "" if flatten else name.split(".")[0]
+                module: ModuleIO = (
+                    None if resolve_imports else ModuleIO.locate(name, output, head)
+                ) or ModuleIO.from_name(name, output, head)
+
+                if module is None:
+                    raise InvalidModule(name)
+
+                roots.append((module, head))
+
+            files = None
+            if since is not None or changed_files is not None:
+                files = []
+
+                if since is not None:
+                    try:
+                        files.extend(git_changed_files(since))
+                    except ChangesError as e:
+                        raise click.ClickException(f"git diff failed: {e}".strip())
+
+                if changed_files is not None:
+                    files.extend(read_changed_files(changed_files))
+
+            mods: LIST[ModuleIO] = []
+            deleted: LIST[ModuleIO] = []
+
+            for module, head in roots:
+                if files is not None:
+                    changed, removed = changed_modules(
+                        module, files, head, discovery=discovery
                     )
-
-                    org_name = re.sub(rf"^{test_pfx}(.+)", r"\1", el.name.value)
-                    key = f"{mod.name}.{org_name}"
+                    mods.extend(changed)
+                    deleted.extend(removed)
 
                 else:
-                    key = f"#{i}"
-
-                test_codes.update({key: Code(module=mod, cst=el)})
-
-            for key, tcode in test_codes.items():
-                if key not in src_codes:
-                    continue
+                    mods.extend(
+                        module.iter_submodules(
+                            head, resolve_imports=resolve_imports, discovery=discovery
+                        )
+                    )
 
-                scode = src_codes.pop(key)
+            if files is None and stale_mode != "keep":
+                for module, head in roots:
+                    deleted.extend(orphaned_tests(module, head))
+
+            # NOTE: nested roots yield the same modules
+            mods = list(dict.fromkeys(mods))
+            deleted = list(dict.fromkeys(deleted))
+
+        manifest = None
+        # NOTE: the manifest also records which tests gutt inserted, the
+        # only ones --prune removes
+        if incremental or stale_mode == "prune":
+            from gutt import __version__
+
+            config = dict(
+                version=__version__,
+                template_class=template_class,
+                exclude=list(exclude),
+                include=list(include),
+                formatter=formatter,
+                format_scope=format_scope,
+            )
+            manifest = Manifest.load(output, config)
+
+        def generated(mods: LIST[ModuleIO]) -> LIST[Tuple[str, ...]]:
+            return [manifest.qualnames(mod) if manifest else () for mod in mods]
+
+        def prune_orphan(mod: ModuleIO) -> str:
+            from gutt.generator import Messages, generate_module
+
+            echo = Messages(detail=progress.detail)
+            result = generate_module(
+                mod,
+                _load_template(template_class),
+                formatter=formatter,
+                format_scope=format_scope,
+                echo=echo,
+                source="",
+                stale="prune",
+                generated=manifest.qualnames(mod),
+            )
+            progress.messages(echo)
+
+            if result.failed:
+                return "failed"
+
+            manifest.update(mod, result.qualnames)
+
+            if result.source is None:
+                return "orphaned"
+
+            # NOTE: hand-written tests keep the module alive
+            if result.source.strip():
+                makefile(mod.dst, result.source, overwrite=True)
+                return "trimmed"
+
+            os.remove(mod.dst)
+            return "pruned"
+
+        for mod in deleted:
+            status = "orphaned"
+
+            if (
+                stale_mode == "prune"
+                and not dryrun
+                and manifest is not None
+                and manifest.tracks(mod)
+            ):
+                status = prune_orphan(mod)
+
+            report.add(mod, status)
+            progress.done(mod, status)
+
+        qfilter = QualnameFilter(exclude, include)
+
+        # NOTE: stale tests are only found by parsing, no module is skipped then
+        if incremental and stale_mode == "keep":
+            fresh, stale = [], []
+            for mod in mods:
+                (fresh if manifest.is_fresh(mod) else stale).append(mod)
+
+            mods = stale
+
+            for mod in fresh:
+                report.add(mod, "fresh")
+                progress.done(mod, "fresh")
+
+            if fresh:
+                progress.secho(
+                    f"unchanged since last run, skip: {len(fresh)} module(s)",
+                    fg="bright_black",
+                )
 
-                if not isinstance(scode.cst, ClassDef):
-                    continue
+        render_cache = (
+            RenderCache.load(output, render_cache_size) if use_render_cache else None
+        )
+
+        if watch:
+            # NOTE: stay in this process, so caches are kept warm between events
+            jobs = 1
+            _worker["cache"] = {}
+
+        if jobs > 1 and len(mods) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(
+                max_workers=min(jobs, len(mods)),
+                initializer=_init_worker,
+                initargs=(
+                    path,
+                    template_class,
+                    qfilter,
+                    formatter,
+                    format_scope,
+                    progress.detail,
+                    stale_mode,
+                    render_cache,
+                ),
+            )
+            chunksize = max(1, len(mods) // (jobs * 4))
+            results = executor.map(
+                _generate_in_worker, mods, generated(mods), chunksize=chunksize
+            )
+
+        else:
+            executor = None
+            _worker.pop("Template", None)
+            _worker.update(
+                template_class=template_class,
+                qfilter=qfilter,
+                formatter=formatter,
+                format_scope=format_scope,
+                detail=progress.detail,
+                stale=stale_mode,
+                render_cache=render_cache,
+            )
+            results = map(_generate_in_worker, mods, generated(mods))
+
+        queue = WriteQueue() if batch_writes else None
+        pending = []
+
+        created = set()
+
+        def track_dir(dst: str):
+            dirpath = os.path.dirname(dst)
+
+            if not os.path.isdir(dirpath):
+                created.add(dirpath)
+
+        def fix_inits():
+            if fix_all_inits:
+                populate_init(output)
+
+            elif created:
+                populate_init(output, created)
+                created.clear()
+
+        def done(mod: ModuleIO, result: Generated, stats: Stats, status: str):
+            report.add(mod, status, stats)
+            progress.done(mod, status)
+
+            if manifest is not None and not (dryrun or result.failed):
+                manifest.update(mod, result.qualnames)
+
+        def consume(mods, results):
+            progress.start(len(mods))
+
+            for mod, (result, echo, stats, rendered) in zip(mods, results):
+                progress.messages(echo)
+
+                if render_cache is not None and executor is not None:
+                    render_cache.update(rendered)
+
+                status = "failed" if result.failed else "skipped"
+
+                if result.source is not None:
+                    if dryrun:
+                        status = "dryrun"
+
+                    else:
+                        track_dir(mod.dst)
+
+                        if queue is not None:
+                            queue.put(mod.dst, result.source, overwrite=True)
+                            pending.append((mod, result, stats))
+                            continue
+
+                        with stats.phase("write"):
+                            written = makefile(mod.dst, result.source, overwrite=True)
+
+                        if written:
+                            status = "written"
+                            stats.count("bytes_written", len(result.source.encode()))
+
+                        else:
+                            status = "unchanged"
+
+                done(mod, result, stats, status)
+
+            if queue is not None:
+                with report.total.phase("write"):
+                    written = set(queue.flush())
+
+                for mod, result, stats in pending:
+                    if mod.dst in written:
+                        stats.count("bytes_written", len(result.source.encode()))
+
+                    done(
+                        mod,
+                        result,
+                        stats,
+                        "written" if mod.dst in written else "unchanged",
+                    )
 
-                test_pfx = Template.class_layout.method_layout.prefix
-                tmethods = OrderedDict()
-                for j, el in enumerate(tcode.cst.body.body):
-                    key = el.name.value if isinstance(el, FunctionDef) else f"#{j}"
+                pending.clear()
 
-                    tmethods.update({key: el})
+            if manifest is not None and not dryrun:
+                manifest.save()
 
-                for el in scode.cst.body.body:
-                    # TODO: allow private methods?
-                    if (not isinstance(el, FunctionDef)) or el.name.value.startswith(
-                        "__"
-                    ):
-                        continue
+            if render_cache is not None and not dryrun:
+                render_cache.save()
 
-                    tname = f"{test_pfx}{el.name.value}"
+            progress.flush()
 
-                    if tname not in tmethods:
-                        f: FunctionDef = Template.class_layout.method_layout(
-                            Code(module=scode.module, cst=el)
-                        ).build()
+        try:
+            consume(mods, results)
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
-                        click.echo("\033[K", nl=False)
-                        click.secho(
-                            "adding method: ",
-                            nl=False,
-                            fg="bright_white",
-                        )
-                        click.secho(
-                            f"{scode.cst.name.value}:{el.name.value}",
-                            fg="bright_cyan",
-                        )
+        if watch:
+            fix_inits()
 
-                        tcode.cst.body.body.append(f)
-
-                        code_added += 1
-
-            for key, scode in src_codes.items():
-                Layout = (
-                    Template.function_layout
-                    if isinstance(scode.cst, FunctionDef)
-                    else Template.class_layout
+            watchers = [
+                Watcher(
+                    module, head, resolve_imports=resolve_imports, discovery=discovery
                 )
+                for module, head in roots
+            ]
 
-                what = "function" if isinstance(scode.cst, FunctionDef) else "class"
+            for module, _ in roots:
+                progress.secho("watching: ", nl=False, fg="bright_white")
+                progress.secho(os.path.dirname(module.src), fg="bright_green")
 
-                obj = Layout(scode).build()
-                click.echo("\033[K", nl=False)
-                click.secho(f"adding {what}: ", nl=False, fg="bright_white")
-                click.secho(f"{obj.name.value}", fg="bright_cyan")
+            progress.flush()
 
-                test_mod.body.append(obj)
-                code_added += 1
+            try:
+                while True:
+                    time.sleep(watch_interval)
 
-            if code_added > 0:
-                code = test_mod.code
-                try:
-                    source = blacking(code)
-                except Exception as error:
-                    msg = f'{type(error).__name__}: {error}. src: "{mod.src}"'
-                    click.secho(msg, fg="bright_red")
-                    click.secho(code, fg="bright_yellow")
-                    continue
+                    changed = list(
+                        dict.fromkeys(mod for w in watchers for mod in w.poll())
+                    )
 
-                if dryrun:
-                    click.secho("(dryrun)", nl=False, fg="bright_yellow")
-                    click.secho(f" writing: {mod.dst}", fg="bright_black")
+                    if changed:
+                        consume(
+                            changed,
+                            map(_generate_in_worker, changed, generated(changed)),
+                        )
+                        fix_inits()
 
-                else:
-                    makefile(mod.dst, source, overwrite=True)
+            except KeyboardInterrupt:
+                pass
 
-                    click.secho("writing: ", nl=False, fg="bright_white")
-                    click.secho(f"{mod.dst}", fg="bright_green")
+        fix_inits()
+        progress.finish()
 
-            else:
-                click.secho("all templates populated, skip.", fg="bright_black")
+    if report_format == "json":
+        content = report.to_json(indent=2)
 
-    populate_init(output)
+        if report_file:
+            makefile(report_file, content + "\n", overwrite=True)
+        else:
+            click.echo(content)
@@ -0,0 +1,239 @@
+import os
+import re
+from typing import Dict, Iterable, Iterator
+from typing import List as LIST
+from typing import NamedTuple, Optional, Pattern, Sequence, Tuple
+
+IGNORE_FILE = ".gitignore"
+
+
+class Rule(NamedTuple):
+    """A compiled gitignore-style pattern, relative to its `base` directory."""
+
+    regex: Pattern
+    base: str
+    negate: bool = False
+    dir_only: bool = False
+    anchored: bool = False
+
+    def match(self, path: str, isdir: bool) -> bool:
+        if self.dir_only and not isdir:
+            return False
+
+        if self.anchored:
+            rel = os.path.relpath(path, self.base)
+
+            if rel.startswith(os.pardir):
+                return False
+
+            return self.regex.match(rel.replace(os.path.sep, "/")) is not None
+
+        return self.regex.match(os.path.basename(path)) is not None
+
+
+def _translate(pattern: str) -> str:
+    out, i = [], 0
+
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("/.*")
+            i += 3
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            out.append(pattern[i : end + 1].replace("[!", "[^", 1))
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+
+    return "".join(out) + r"\Z"
+
+
+def parse_rules(lines: Iterable[str], base: str) -> LIST[Rule]:
+    """Compile the lines of a ".gitignore" file located in `base`."""
+
+    rules = []
+
+    for line in lines:
+        line = line.rstrip("\n").rstrip()
+
+        if not line or line.startswith("#"):
+            continue
+
+        negate = line.startswith("!")
+        line = line[1:] if negate else line
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+
+        # NOTE: a slash at the beginning or in the middle anchors the pattern
+        anchored = "/" in line
+        line = line.lstrip("/")
+
+        if not line:
+            continue
+
+        rules.append(
+            Rule(
+                regex=re.compile(_translate(line)),
+                base=base,
+                negate=negate,
+                dir_only=dir_only,
+                anchored=anchored,
+            )
+        )
+
+    return rules
+
+
+def _read_rules(dirpath: str) -> LIST[Rule]:
+    try:
+        with open(os.path.join(dirpath, IGNORE_FILE), "r") as f:
+            return parse_rules(f, dirpath)
+
+    except (FileNotFoundError, NotADirectoryError, UnicodeDecodeError):
+        return []
+
+
+def _ignored(rules: Sequence[Rule], path: str, isdir: bool) -> bool:
+    ignored = False
+
+    for rule in rules:
+        if rule.match(path, isdir):
+            ignored = not rule.negate
+
+    return ignored
+
+
+class Discovery:
+    """Walk a package, pruning directories before descending into them.
+
+    Directories matching `exclude_dirs` (gitignore-style patterns relative
+    to the walked package) or ignored by ".gitignore" files are never
+    entered, modules larger than `max_file_size` bytes are skipped.
+    """
+
+    def __init__(
+        self,
+        exclude_dirs: Sequence[str] = (),
+        max_file_size: Optional[int] = None,
+        gitignore: bool = True,
+    ):
+        self.exclude_dirs = tuple(exclude_dirs)
+        self.max_file_size = max_file_size
+        self.gitignore = gitignore
+        self._rules: Dict[str, Tuple[Rule, ...]] = {}
+
+    def _root_rules(self, top: str) -> Tuple[Rule, ...]:
+        """Rules of the ".gitignore" files above `top`, up to the git work tree."""
+
+        if not self.gitignore:
+            return ()
+
+        parents, parent = [], os.path.dirname(os.path.abspath(top))
+
+        while True:
+            parents.append(parent)
+
+            if os.path.exists(os.path.join(parent, ".git")):
+                break
+
+            parent, prev = os.path.dirname(parent), parent
+
+            if parent == prev:
+                # NOTE: not in a git work tree, only the package's own rules apply
+                parents = []
+                break
+
+        return tuple(rule for p in reversed(parents) for rule in _read_rules(p))
+
+    def _dir_rules(self, dirpath: str, inherited: Tuple[Rule, ...]):
+        if dirpath not in self._rules:
+            own = _read_rules(dirpath) if self.gitignore else []
+            self._rules[dirpath] = inherited + tuple(own)
+
+        return self._rules[dirpath]
+
+    def _pruned_dir(
+        self, excludes: Sequence[Rule], rules: Sequence[Rule], path: str
+    ) -> bool:
+        return _ignored(excludes, path, True) or _ignored(rules, path, True)
+
+    def _skipped_file(self, rules: Sequence[Rule], path: str) -> bool:
+        if _ignored(rules, path, False):
+            return True
+
+        if self.max_file_size is not None and path.endswith(".py"):
+            try:
+                return os.stat(path).st_size > self.max_file_size
+            except FileNotFoundError:
+                return True
+
+        return False
+
+    def walk(self, top: str) -> Iterator[Tuple[str, LIST[str], LIST[str]]]:
+        """Same as `os.walk`, with pruned, importable and sorted directories."""
+
+        excludes = tuple(parse_rules(self.exclude_dirs, top))
+        inherited = {top: self._root_rules(top)}
+
+        for dirpath, dirnames, filenames in os.walk(top):
+            rules = self._dir_rules(dirpath, inherited.pop(dirpath))
+
+            # NOTE: a directory must be a valid identifier to be importable
+            dirnames[:] = sorted(
+                d
+                for d in dirnames
+                if d.isidentifier()
+                and not self._pruned_dir(excludes, rules, os.path.join(dirpath, d))
+            )
+
+            for d in dirnames:
+                inherited[os.path.join(dirpath, d)] = rules
+
+            filenames[:] = sorted(
+                f
+                for f in filenames
+                if not self._skipped_file(rules, os.path.join(dirpath, f))
+            )
+
+            yield dirpath, dirnames, filenames
+
+    def skipped(self, path: str, top: str) -> bool:
+        """Whether `walk(top)` would not yield the file `path`."""
+
+        top, path = os.path.abspath(top), os.path.abspath(path)
+        rel = os.path.relpath(path, top)
+
+        if rel.startswith(os.pardir):
+            return True
+
+        excludes = tuple(parse_rules(self.exclude_dirs, top))
+        rules = self._dir_rules(top, self._root_rules(top))
+        dirpath = top
+
+        for name in rel.split(os.path.sep)[:-1]:
+            dirpath = os.path.join(dirpath, name)
+
+            if self._pruned_dir(excludes, rules, dirpath):
+                return True
+
+            rules = self._dir_rules(dirpath, rules)
+
+        return _ignored(rules, path, False) or (
+            self.max_file_size is not None
+            and os.path.isfile(path)
+            and os.path.getsize(path) > self.max_file_size
+        )
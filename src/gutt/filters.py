@@ -0,0 +1,73 @@
+import fnmatch
+import re
+from functools import lru_cache
+from typing import Dict, Pattern, Sequence, Tuple, Union
+
+Patterns = Union[str, Sequence[str], None]
+
+
+def _normalize(patterns: Patterns) -> Tuple[str, ...]:
+    if patterns is None:
+        return ()
+
+    if isinstance(patterns, str):
+        return (patterns,)
+
+    return tuple(p for p in patterns if p)
+
+
+def _translate(pattern: str) -> str:
+    if pattern.startswith("glob:"):
+        return f"^{fnmatch.translate(pattern[5:])}"
+
+    if pattern.startswith("re:"):
+        return pattern[3:]
+
+    return pattern
+
+
+@lru_cache(maxsize=None)
+def compile_patterns(patterns: Tuple[str, ...]) -> Tuple[Pattern, ...]:
+    """Compile regex (or "glob:" prefixed) patterns.
+
+    Each pattern is compiled on its own, joining them would break inline
+    flags and shift the group numbers of backreferences.
+    """
+
+    return tuple(re.compile(_translate(p)) for p in patterns)
+
+
+def _search(patterns: Tuple[Pattern, ...], name: str) -> bool:
+    return any(p.search(name) is not None for p in patterns)
+
+
+class QualnameFilter:
+    """Include/exclude filter over module names and qualnames.
+
+    Regex patterns are searched (as `re.search`), patterns prefixed with
+    "glob:" must match the whole name. Verdicts on qualnames are indexed,
+    so each name is matched at most once.
+    """
+
+    def __init__(self, excludes: Patterns = None, includes: Patterns = None):
+        self.excludes = _normalize(excludes)
+        self.includes = _normalize(includes)
+        self._exclude = compile_patterns(self.excludes)
+        self._include = compile_patterns(self.includes)
+        self._index: Dict[str, bool] = {}
+
+    def excluded(self, name: str) -> bool:
+        return _search(self._exclude, name)
+
+    def accepts(self, qualname: str) -> bool:
+        try:
+            return self._index[qualname]
+        except KeyError:
+            pass
+
+        accepted = not self.excluded(qualname) and (
+            not self._include or _search(self._include, qualname)
+        )
+        self._index[qualname] = accepted
+
+        return accepted
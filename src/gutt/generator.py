@@ -0,0 +1,471 @@
+import ast
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Mapping, Optional, Union
+
+import click
+from libcst import Module
+
+from .filters import Patterns, QualnameFilter
+from .merge import (
+    TestModule,
+    find_stale,
+    format_snippets,
+    merge_cst,
+    prunable,
+    render,
+    splice,
+)
+from .model import Code, Generated, ModuleIO
+from .rendercache import RenderCache, Snippet, render_key
+from .report import Stats
+from .scanner import CLASS, FUNCTION, scan, splitlines
+from .template import Template as T
+from .utils import blacking, text_width
+
+
+class GenerationError(Exception):
+    pass
+
+
+class Messages(list):
+    """Buffer of `click.secho` calls, replayed in order by `render`.
+
+    Per-symbol messages are marked as `detail`, they are dropped right away
+    when the buffer is created with `detail=False`.
+    """
+
+    def __init__(self, detail: bool = True):
+        super().__init__()
+        self.detail = detail
+
+    def secho(self, message: str = "", detail: bool = False, nl=True, **styles):
+        if detail and not self.detail:
+            return
+
+        self.append((message, detail, nl, styles))
+
+    def render(self, detail: bool = True) -> str:
+        return "".join(
+            (click.style(message, **styles) if styles else message)
+            + ("\n" if nl else "")
+            for message, is_detail, nl, styles in self
+            if detail or not is_detail
+        )
+
+
+def _parse_file(path: str, parse: Callable, cache: Optional[Dict] = None):
+    """Parse a file, reusing the result cached for its current mtime and size."""
+
+    if cache is None:
+        with open(path, "r") as f:
+            return parse(f.read())
+
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+
+    if path in cache and cache[path][0] == key:
+        return cache[path][1]
+
+    with open(path, "r") as f:
+        value = parse(f.read())
+
+    cache[path] = (key, value)
+
+    return value
+
+
+def generate_module(
+    mod: ModuleIO,
+    Template: T,
+    qfilter: Optional[QualnameFilter] = None,
+    formatter: str = "inproc",
+    format_scope: str = "file",
+    echo: Optional[Messages] = None,
+    cache: Optional[Dict] = None,
+    stats: Optional[Stats] = None,
+    source: Optional[str] = None,
+    existing: Optional[Union[str, Module]] = None,
+    stale: str = "keep",
+    render_cache: Optional[RenderCache] = None,
+    generated: Iterable[str] = (),
+) -> Generated:
+    """Generate the test module for `mod`.
+
+    The source and the existing test module are read from `mod.src` and
+    `mod.dst` unless given by `source` and `existing`. With `format_scope`
+    "fragments", only the inserted code is formatted. With `stale` "report"
+    tests of symbols gone from the source are listed, "prune" removes those
+    of the `generated` qualnames, templates inserted by previous runs. The
+    result records the qualnames of the templates inserted so far.
+    Formatted templates are looked up in, and added to, `render_cache`.
+    Templates with the "text" backend skip libcst and the formatter for the
+    layouts having a text template.
+    """
+
+    code_added = 0
+    echo = Messages() if echo is None else echo
+    stats = Stats() if stats is None else stats
+
+    qfilter = QualnameFilter() if qfilter is None else qfilter
+
+    if qfilter.excluded(mod.name):
+        echo.secho("ignoring module: ", detail=True, nl=False, fg="bright_white")
+        echo.secho(mod.name, detail=True, fg="bright_black")
+        return Generated(module=mod, qualnames=tuple(generated))
+
+    def parse_src(text: str):
+        return scan(text, mod.name), splitlines(text)
+
+    try:
+        with stats.phase("parse_src"):
+            if source is None:
+                symbols, src_lines = _parse_file(mod.src, parse_src, cache)
+            else:
+                symbols, src_lines = parse_src(source)
+
+    except Exception as error:
+        msg = f'{type(error)}: {error}. src: "{mod.src}"'
+        echo.secho(msg, fg="bright_yellow")
+        return Generated(module=mod, error=msg)
+
+    src_codes = OrderedDict()
+
+    for qname, symbol in symbols.items():
+        if not qfilter.accepts(qname):
+            echo.secho("excluding: ", detail=True, nl=False, fg="bright_white")
+            echo.secho(qname, detail=True, fg="bright_black")
+
+            continue
+
+        src_codes.update({qname: symbol})
+
+        echo.secho("\033[K", detail=True, nl=False)
+        echo.secho("collecting: ", detail=True, nl=False, fg="bright_white")
+        echo.secho(f"{qname}", detail=True, fg="bright_cyan")
+
+    generated = frozenset(generated)
+
+    if len(src_codes) == 0 and stale == "keep" and not generated:
+        return Generated(module=mod)
+
+    try:
+        with stats.phase("parse_dst"):
+            if existing is None:
+                test_mod = _parse_file(mod.dst, TestModule, cache)
+            elif isinstance(existing, Module):
+                test_mod = TestModule(existing.code)
+            else:
+                test_mod = TestModule(existing)
+
+        if existing is None:
+            echo.secho("loading: ", detail=True, nl=False, fg="bright_white")
+            echo.secho(f"{mod.dst}", detail=True, fg="bright_green")
+
+    except FileNotFoundError:
+        test_mod = TestModule("")
+
+    except Exception as error:
+        msg = f'{type(error)}: {error}. dst: "{mod.dst}"'
+        echo.secho(msg, fg="bright_yellow")
+        return Generated(module=mod, error=msg)
+
+    prefixes = (
+        Template.function_layout.prefix,
+        Template.class_layout.prefix,
+        Template.class_layout.method_layout.prefix,
+    )
+    test_nodes = test_mod.index(mod.name, *prefixes[:2])
+
+    found, remove, dropped = [], [], set()
+    if stale != "keep":
+        found = find_stale(test_mod, symbols, mod.name, *prefixes)
+
+    if stale == "prune":
+        # NOTE: only templates gutt inserted, never hand-written tests
+        remove, dropped = prunable(found, generated, prefixes[2])
+        stats.count("tests_pruned", len(remove))
+
+    if stale != "keep":
+        for item in found + [item for item in remove if item not in found]:
+            label = (
+                "stale: "
+                if stale == "report" or item in remove
+                else "stale, hand-written, keep: "
+            )
+            echo.secho(label, nl=False, fg="bright_white")
+            echo.secho(f"{mod.dst}::{item.name}", fg="bright_yellow")
+
+        stats.count("stale_tests", len(found))
+
+    stale_names = tuple(item.name for item in found if item not in remove)
+    # NOTE: inserted templates still in the test module, stale ones included
+    inserted = []
+    if generated:
+        inserted.extend(
+            sorted(generated & (test_mod.qualnames(mod.name, *prefixes) - dropped))
+        )
+
+    width = text_width(formatter) if Template.backend == "text" else None
+
+    def snippet(layout: type, code: Code, indent: int = 0) -> Snippet:
+        key = None
+
+        if width is not None:
+            with stats.phase("build"):
+                text = layout(code).text()
+
+            # NOTE: black would wrap longer lines, leave those to it
+            if (
+                text is not None
+                and text.isascii()
+                and all(len(line) + indent <= width for line in text.splitlines())
+            ):
+                stats.count("text_renders")
+                return Snippet(None, text, formatted=True)
+
+        if render_cache is not None:
+            key = render_key(Template, layout, code, formatter)
+            text = render_cache.get(key)
+
+            if text is not None:
+                stats.count("render_cache_hits")
+                return Snippet(key, text, formatted=True)
+
+            stats.count("render_cache_misses")
+
+        with stats.phase("build"):
+            return Snippet(key, render(layout(code).build()))
+
+    methods = []
+    for key, tnode in test_nodes.items():
+        if key not in src_codes:
+            continue
+
+        scode = src_codes.pop(key)
+
+        if scode.kind != CLASS or not isinstance(tnode, ast.ClassDef):
+            continue
+
+        test_pfx = Template.class_layout.method_layout.prefix
+        tmethods = test_mod.methods(tnode)
+
+        funcs = []
+        for name in dict.fromkeys(scode.methods):
+            # TODO: allow private methods?
+            if name.startswith("__"):
+                continue
+
+            tname = f"{test_pfx}{name}"
+
+            if tname not in tmethods:
+                funcs.append(
+                    snippet(
+                        Template.class_layout.method_layout,
+                        Code(module=mod, symbol=scode.method(name), lines=src_lines),
+                        indent=4,
+                    )
+                )
+
+                echo.secho("\033[K", detail=True, nl=False)
+                echo.secho(
+                    "adding method: ",
+                    detail=True,
+                    nl=False,
+                    fg="bright_white",
+                )
+                echo.secho(
+                    f"{scode.name}:{name}",
+                    detail=True,
+                    fg="bright_cyan",
+                )
+
+                code_added += 1
+                inserted.append(f"{key}.{name}")
+                stats.count("methods_added")
+
+        if funcs:
+            methods.append((tnode, funcs))
+
+    nodes = []
+    for key, scode in src_codes.items():
+        Layout = (
+            Template.function_layout
+            if scode.kind == FUNCTION
+            else Template.class_layout
+        )
+
+        what = scode.kind
+
+        nodes.append(snippet(Layout, Code(module=mod, symbol=scode, lines=src_lines)))
+
+        echo.secho("\033[K", detail=True, nl=False)
+        echo.secho(f"adding {what}: ", detail=True, nl=False, fg="bright_white")
+        echo.secho(f"{Layout.prefix}{scode.name}", detail=True, fg="bright_cyan")
+
+        code_added += 1
+        inserted.append(key)
+        stats.count("functions_added" if scode.kind == FUNCTION else "classes_added")
+
+        if scode.kind == CLASS:
+            inserted.extend(
+                f"{key}.{name}"
+                for name in dict.fromkeys(scode.methods)
+                if not name.startswith("__")
+            )
+
+    qualnames = tuple(dict.fromkeys(inserted))
+
+    if code_added == 0 and not remove:
+        echo.secho("all templates populated, skip.", detail=True, fg="bright_black")
+        return Generated(module=mod, qualnames=qualnames, stale=stale_names)
+
+    # NOTE: into an empty module, formatting the fragments alone gives the
+    # same text as formatting the whole module
+    fragments = format_scope == "fragments" or (
+        formatter != "none" and not test_mod.source.strip()
+    )
+
+    code = None
+    try:
+        if fragments:
+            pending_methods = [s for _, ss in methods for s in ss if not s.formatted]
+            pending_nodes = [s for s in nodes if not s.formatted]
+
+            if pending_methods or pending_nodes:
+                with stats.phase("format"):
+                    texts = format_snippets(
+                        [s.text for s in pending_methods],
+                        [s.text for s in pending_nodes],
+                        lambda code: blacking(code, formatter=formatter),
+                    )
+
+                for pending, formatted in zip((pending_methods, pending_nodes), texts):
+                    for s, text in zip(pending, formatted):
+                        s.text, s.formatted = text, True
+
+                        if render_cache is not None:
+                            render_cache.put(s.key, text)
+
+        with stats.phase("merge"):
+            code = splice(
+                test_mod,
+                [(c, [s.text for s in ss]) for c, ss in methods],
+                [s.text for s in nodes],
+                spaced=fragments,
+                remove=remove,
+            )
+
+            if code is None:
+                stats.count("cst_fallbacks")
+                fragments = False
+                code = merge_cst(
+                    test_mod.source,
+                    [(c.name, [s.text for s in ss]) for c, ss in methods],
+                    [s.text for s in nodes],
+                    remove=[item.name for item in remove],
+                )
+
+        source = code
+        if not fragments:
+            with stats.phase("format"):
+                source = blacking(code, formatter=formatter)
+
+    except Exception as error:
+        msg = f'{type(error).__name__}: {error}. src: "{mod.src}"'
+        echo.secho(msg, fg="bright_red")
+
+        if code is not None:
+            echo.secho(code, fg="bright_yellow")
+
+        return Generated(module=mod, error=msg)
+
+    return Generated(
+        module=mod,
+        source=source,
+        qualnames=qualnames,
+        stale=stale_names,
+    )
+
+
+def generate(
+    module_io: ModuleIO,
+    template: Union[T, str] = T,
+    existing_source: Optional[Union[str, Module]] = None,
+    source: Optional[str] = None,
+    exclude: Patterns = None,
+    include: Patterns = None,
+    formatter: str = "inproc",
+    qfilter: Optional[QualnameFilter] = None,
+    format_scope: str = "file",
+) -> str:
+    """Return the test module source for `module_io`, without touching the disk.
+
+    `existing_source` is the current test module as text or a libcst
+    `Module`, new templates are merged into it. The source module is read
+    from `module_io.src` unless given by `source`. A prebuilt `qfilter`
+    takes precedence over `exclude` and `include`.
+    """
+
+    if isinstance(template, str):
+        template = T.load(template)
+
+    result = generate_module(
+        module_io,
+        template,
+        qfilter=qfilter or QualnameFilter(exclude, include),
+        formatter=formatter,
+        format_scope=format_scope,
+        source=source,
+        existing="" if existing_source is None else existing_source,
+    )
+
+    if result.failed:
+        raise GenerationError(result.error)
+
+    if result.source is not None:
+        return result.source
+
+    if isinstance(existing_source, Module):
+        return existing_source.code
+
+    return existing_source or ""
+
+
+def generate_batch(
+    module_ios: Iterable[ModuleIO],
+    template: Union[T, str] = T,
+    existing_sources: Optional[Mapping[str, Union[str, Module]]] = None,
+    sources: Optional[Mapping[str, str]] = None,
+    exclude: Patterns = None,
+    include: Patterns = None,
+    formatter: str = "inproc",
+    format_scope: str = "file",
+) -> Dict[str, str]:
+    """Run `generate` over many modules, return test sources by module name.
+
+    `existing_sources` and `sources` are looked up by module name.
+    """
+
+    if isinstance(template, str):
+        template = T.load(template)
+
+    existing_sources = existing_sources or {}
+    sources = sources or {}
+    qfilter = QualnameFilter(exclude, include)
+
+    return OrderedDict(
+        (
+            mod.name,
+            generate(
+                mod,
+                template,
+                existing_source=existing_sources.get(mod.name),
+                source=sources.get(mod.name),
+                formatter=formatter,
+                qfilter=qfilter,
+                format_scope=format_scope,
+            ),
+        )
+        for mod in module_ios
+    )
@@ -0,0 +1,164 @@
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+import attr
+
+from .model import ModuleIO
+from .utils import Serializable, immutable, makefile
+
+MANIFEST_NAME = ".gutt-cache.json"
+MANIFEST_VERSION = 2
+
+
+def filehash(path: str) -> str:
+    import hashlib
+
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+@immutable
+class FileState(Serializable):
+    hash: str
+    mtime: float
+    size: int
+
+    @classmethod
+    def from_path(cls, path: str, digest: bool = True) -> Optional["FileState"]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        return cls(
+            hash=filehash(path) if digest else "", mtime=st.st_mtime, size=st.st_size
+        )
+
+    def same_stat(self, other: Optional["FileState"]) -> bool:
+        return (
+            other is not None and self.mtime == other.mtime and self.size == other.size
+        )
+
+
+@immutable
+class Entry(Serializable):
+    src: FileState
+    dst: Optional[FileState] = None
+    qualnames: Tuple[str, ...] = ()
+
+
+class Manifest:
+    """Content-hash record of the src/dst pairs processed by previous runs.
+
+    A pair whose files match their recorded stat (or, failing that, their
+    recorded hash) is up to date and can be skipped without parsing. The
+    recorded qualnames tell which tests of the test module gutt generated.
+    """
+
+    def __init__(self, path: str, config: Dict):
+        self.path = path
+        self.config = config
+        self.entries: Dict[str, Entry] = {}
+
+    @classmethod
+    def load(cls, outdir: str, config: Dict) -> "Manifest":
+        manifest = cls(os.path.join(outdir, MANIFEST_NAME), config)
+
+        try:
+            with open(manifest.path, "r") as f:
+                data = json.load(f)
+
+        except (FileNotFoundError, ValueError):
+            return manifest
+
+        if data.get("version") != MANIFEST_VERSION:
+            return manifest
+
+        same_config = data.get("config") == config
+
+        for key, entry in data.get("entries", {}).items():
+            try:
+                entry = Entry.from_dict(entry)
+            except Exception:
+                continue
+
+            if not same_config:
+                # NOTE: never fresh under another config, the qualnames still hold
+                entry = attr.evolve(entry, src=FileState(hash="", mtime=-1, size=-1))
+
+            manifest.entries[key] = entry
+
+        return manifest
+
+    def _key(self, mod: ModuleIO) -> str:
+        return f"{mod.src}::{mod.dst}"
+
+    def _check(self, recorded: Optional[FileState], path: str) -> Optional[bool]:
+        """True if unchanged, None if only touched, False if modified."""
+
+        current = FileState.from_path(path, digest=False)
+
+        if recorded is None or current is None:
+            return recorded is None and current is None
+
+        if recorded.same_stat(current):
+            return True
+
+        if recorded.size == current.size and recorded.hash == filehash(path):
+            return None
+
+        return False
+
+    def is_fresh(self, mod: ModuleIO) -> bool:
+        entry = self.entries.get(self._key(mod))
+
+        if entry is None:
+            return False
+
+        checks = [self._check(entry.src, mod.src), self._check(entry.dst, mod.dst)]
+
+        if False in checks:
+            return False
+
+        if None in checks:
+            # NOTE: content unchanged, refresh the recorded stat
+            self.update(mod, entry.qualnames)
+
+        return True
+
+    def tracks(self, mod: ModuleIO) -> bool:
+        """Whether a previous run generated `mod.dst`."""
+
+        return self._key(mod) in self.entries
+
+    def qualnames(self, mod: ModuleIO) -> Tuple[str, ...]:
+        entry = self.entries.get(self._key(mod))
+
+        return () if entry is None else entry.qualnames
+
+    def update(self, mod: ModuleIO, qualnames: Tuple[str, ...] = ()):
+        src = FileState.from_path(mod.src)
+
+        if src is None:
+            self.entries.pop(self._key(mod), None)
+            return
+
+        self.entries[self._key(mod)] = Entry(
+            src=src, dst=FileState.from_path(mod.dst), qualnames=tuple(qualnames)
+        )
+
+    def save(self):
+        entries = {
+            key: entry.to_dict()
+            for key, entry in sorted(self.entries.items())
+            # NOTE: an orphaned test module is kept track of until pruned
+            if any(os.path.isfile(path) for path in key.split("::", 1))
+        }
+
+        content = json.dumps(
+            {"version": MANIFEST_VERSION, "config": self.config, "entries": entries},
+            indent=1,
+        )
+
+        makefile(self.path, content, overwrite=True)
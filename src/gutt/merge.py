@@ -0,0 +1,420 @@
+import ast
+from collections import Counter, OrderedDict, defaultdict
+from typing import (
+    Callable,
+    Collection,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import libcst
+from libcst import (
+    BaseCompoundStatement,
+    ClassDef,
+    FunctionDef,
+    IndentedBlock,
+    Pass,
+    SimpleStatementLine,
+    SimpleStatementSuite,
+)
+
+from .model import CLASS, Symbol
+from .scanner import splitlines
+
+_FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef)
+_INDENT = " " * 4
+# NOTE: generated along with every test class
+FIXTURES = ("setup_class", "teardown_class", "setup_method", "teardown_method")
+
+
+class Stale(NamedTuple):
+    """A test whose symbol `qualname` is gone, `parent` is the test class of
+    a method.
+    """
+
+    name: str
+    qualname: str
+    node: ast.stmt
+    parent: Optional[ast.ClassDef] = None
+
+
+def strip_prefix(name: str, prefix: str) -> str:
+    """Strip the test prefix from a test name, if anything is left after it."""
+
+    if len(name) > len(prefix) and name.startswith(prefix):
+        return name[len(prefix) :]
+
+    return name
+
+
+class TestModule:
+    """Source of an existing test module, indexed with the stdlib "ast" parser."""
+
+    # NOTE: not a test case, despite the name
+    __test__ = False
+
+    def __init__(self, source: str):
+        self.source = source
+        self.lines = splitlines(source)
+        self.body = ast.parse(source).body
+
+    def index(
+        self, modname: str, function_prefix: str, class_prefix: str
+    ) -> Dict[str, ast.stmt]:
+        """Map the qualname targeted by each top-level test to its node."""
+
+        nodes = OrderedDict()
+
+        for node in self.body:
+            if isinstance(node, _FUNCTIONS):
+                prefix = function_prefix
+            elif isinstance(node, ast.ClassDef):
+                prefix = class_prefix
+            else:
+                continue
+
+            nodes[f"{modname}.{strip_prefix(node.name, prefix)}"] = node
+
+        return nodes
+
+    @staticmethod
+    def methods(node: ast.ClassDef) -> Set[str]:
+        return {el.name for el in node.body if isinstance(el, _FUNCTIONS)}
+
+    def qualnames(
+        self,
+        modname: str,
+        function_prefix: str,
+        class_prefix: str,
+        method_prefix: str,
+    ) -> Set[str]:
+        """Qualnames targeted by the tests, and test methods, of the module."""
+
+        names = set()
+
+        for qualname, node in self.index(
+            modname, function_prefix, class_prefix
+        ).items():
+            names.add(qualname)
+
+            if isinstance(node, ast.ClassDef):
+                names.update(
+                    f"{qualname}.{strip_prefix(name, method_prefix)}"
+                    for name in self.methods(node)
+                )
+
+        return names
+
+
+def _pass_line() -> SimpleStatementLine:
+    return SimpleStatementLine(body=[Pass()])
+
+
+def render(node: BaseCompoundStatement) -> str:
+    return libcst.Module(body=[node]).code
+
+
+def _reindent(code: str, old: str, new: str) -> str:
+    return "".join(
+        f"{new}{line[len(old):]}" if line.strip() and line.startswith(old) else line
+        for line in splitlines(code)
+    )
+
+
+def _segment(lines: Sequence[str], node: ast.stmt) -> str:
+    start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+
+    return "".join(lines[start - 1 : node.end_lineno])
+
+
+def format_snippets(
+    methods: Sequence[str], nodes: Sequence[str], format: Callable[[str], str]
+) -> Tuple[List[str], List[str]]:
+    """Format methods and top-level tests in a single formatter call, each
+    method wrapped into a dummy class of its own. Texts are returned in the
+    same order, methods dedented.
+    """
+
+    wrapped = "".join(
+        f"class _{i}:\n{_reindent(code, '', _INDENT)}" for i, code in enumerate(methods)
+    )
+    formatted = format(wrapped + "".join(nodes))
+
+    lines = splitlines(formatted)
+    body = ast.parse(formatted).body
+
+    return (
+        [
+            _reindent(_segment(lines, c.body[0]), _INDENT, "")
+            for c in body[: len(methods)]
+        ],
+        [_segment(lines, node) for node in body[len(methods) :]],
+    )
+
+
+def find_stale(
+    test_mod: TestModule,
+    symbols: Mapping[str, Symbol],
+    modname: str,
+    function_prefix: str,
+    class_prefix: str,
+    method_prefix: str,
+) -> List[Stale]:
+    """Tests named after a symbol, or a method, missing from `symbols`.
+
+    Other code of the test module, like fixtures and helpers not carrying
+    the test prefixes, is never reported.
+    """
+
+    stale = []
+
+    for node in test_mod.body:
+        if isinstance(node, _FUNCTIONS):
+            prefix = function_prefix
+        elif isinstance(node, ast.ClassDef):
+            prefix = class_prefix
+        else:
+            continue
+
+        name = strip_prefix(node.name, prefix)
+
+        if name == node.name:
+            continue
+
+        qualname = f"{modname}.{name}"
+        symbol = symbols.get(qualname)
+
+        if symbol is None:
+            stale.append(Stale(node.name, qualname, node))
+
+        elif isinstance(node, ast.ClassDef) and symbol.kind == CLASS:
+            for el in node.body:
+                if not isinstance(el, _FUNCTIONS):
+                    continue
+
+                name = strip_prefix(el.name, method_prefix)
+
+                if name != el.name and name not in symbol.methods:
+                    stale.append(
+                        Stale(f"{node.name}.{el.name}", f"{qualname}.{name}", el, node)
+                    )
+
+    return stale
+
+
+def prunable(
+    stale: Sequence[Stale], generated: Collection[str], method_prefix: str
+) -> Tuple[List[Stale], Set[str]]:
+    """The parts of the `stale` tests gutt generated, by their `generated`
+    qualnames, and the qualnames they held.
+
+    A stale test class loses its generated methods, and its fixtures if the
+    class itself was generated, it is removed as a whole only when nothing
+    else is left in it.
+    """
+
+    remove, dropped = [], set()
+
+    for item in stale:
+        if item.parent is not None or not isinstance(item.node, ast.ClassDef):
+            if item.qualname in generated:
+                remove.append(item)
+                dropped.add(item.qualname)
+
+            continue
+
+        cls, owned = item.node, item.qualname in generated
+        members = []
+
+        for el in cls.body:
+            if not isinstance(el, _FUNCTIONS):
+                continue
+
+            name = strip_prefix(el.name, method_prefix)
+            qualname = f"{item.qualname}.{name}"
+
+            if (name != el.name and qualname in generated) or (
+                owned and el.name in FIXTURES
+            ):
+                members.append(Stale(f"{cls.name}.{el.name}", qualname, el, cls))
+
+        if not (owned or members):
+            continue
+
+        dropped.add(item.qualname)
+        dropped.update(member.qualname for member in members)
+
+        if len(members) == len(cls.body):
+            remove.append(item)
+        else:
+            remove.extend(members)
+
+    return remove, dropped
+
+
+def _drop_lines(lines: Sequence[str], remove: Sequence[Stale]) -> Set[int]:
+    drop = set()
+
+    for item in remove:
+        node = item.node
+        start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+
+        # NOTE: take the blank lines above along, to keep the spacing
+        while start > 1 and not lines[start - 2].strip():
+            start -= 1
+
+        drop.update(range(start - 1, node.end_lineno))
+
+    return drop
+
+
+def splice(
+    test_mod: TestModule,
+    methods: Sequence[Tuple[ast.ClassDef, Sequence[str]]],
+    nodes: Sequence[str],
+    spaced: bool = False,
+    remove: Sequence[Stale] = (),
+) -> Optional[str]:
+    """Insert the texts of new methods at the end of their test classes and
+    of new tests after the last statement, in a single pass over the lines.
+    Tests in `remove` are cut out of the same pass.
+
+    With `spaced`, the inserted texts are already formatted and get spaced
+    out by black's blank lines, the existing code is kept byte for byte.
+
+    Returns None if a class body is on the same line as its header, it
+    must be merged by `merge_cst` then.
+    """
+
+    lines = test_mod.lines
+    inserts: Dict[int, List[str]] = defaultdict(list)
+
+    indents = []
+    for cls, _ in methods:
+        first = cls.body[0]
+        indent = lines[first.lineno - 1][: first.col_offset]
+
+        if indent.strip():
+            return None
+
+        indents.append(indent)
+
+    if spaced:
+        bodies = ["".join(f"\n{text}" for text in texts) for _, texts in methods]
+        rest = "\n\n".join(nodes)
+        sep = "\n\n" if "".join(lines).strip() else ""
+
+    else:
+        bodies = ["".join(texts) for _, texts in methods]
+        rest = "".join(nodes)
+        sep = ""
+
+    for (cls, _), indent, body in zip(methods, indents, bodies):
+        inserts[cls.end_lineno].append(_reindent(body, "", indent))
+
+    emptied = Counter(item.parent for item in remove if item.parent is not None)
+    for cls, num in emptied.items():
+        if num == len(cls.body) and cls.end_lineno not in inserts:
+            first = cls.body[0]
+            indent = lines[first.lineno - 1][: first.col_offset]
+            inserts[cls.end_lineno].append(f"{indent}pass\n")
+
+    drop = _drop_lines(lines, remove)
+
+    end = test_mod.body[-1].end_lineno if test_mod.body else len(lines)
+
+    # NOTE: indented comments below the last statement belong to its block
+    for i in range(end, len(lines)):
+        if not lines[i].strip():
+            continue
+
+        if lines[i][:1] not in " \t" or not lines[i].lstrip().startswith("#"):
+            break
+
+        end = i + 1
+
+    if rest:
+        inserts[end].append(f"{sep}{rest}")
+
+    def keep(start: int, stop: Optional[int] = None) -> List[str]:
+        return [
+            line for i, line in enumerate(lines[start:stop], start) if i not in drop
+        ]
+
+    chunks, start = [], 0
+    for lineno in sorted(inserts):
+        chunks.extend(keep(start, lineno))
+
+        if chunks and not chunks[-1].endswith("\n"):
+            chunks.append("\n")
+
+        chunks.extend(inserts[lineno])
+        start = lineno
+
+    chunks.extend(keep(start))
+
+    return "".join(chunks)
+
+
+def merge_cst(
+    source: str,
+    methods: Sequence[Tuple[str, Sequence[str]]],
+    nodes: Sequence[str],
+    remove: Sequence[str] = (),
+) -> str:
+    """Same as `splice`, through a full libcst round trip. Tests to
+    `remove` are given by their names, as in `Stale.name`.
+    """
+
+    remove = set(remove)
+    module = libcst.parse_module(source)
+    body = [
+        stmt
+        for stmt in module.body
+        if not (isinstance(stmt, (ClassDef, FunctionDef)) and stmt.name.value in remove)
+    ]
+
+    for i, stmt in enumerate(body):
+        if not isinstance(stmt, ClassDef) or isinstance(
+            stmt.body, SimpleStatementSuite
+        ):
+            continue
+
+        kept = [
+            el
+            for el in stmt.body.body
+            if not (
+                isinstance(el, FunctionDef)
+                and f"{stmt.name.value}.{el.name.value}" in remove
+            )
+        ]
+
+        if len(kept) != len(stmt.body.body):
+            body[i] = stmt.with_changes(
+                body=stmt.body.with_changes(body=kept or [_pass_line()])
+            )
+    classes = {
+        stmt.name.value: i for i, stmt in enumerate(body) if isinstance(stmt, ClassDef)
+    }
+
+    for name, texts in methods:
+        funcs = [libcst.parse_statement(text) for text in texts]
+        i = classes[name]
+        block = body[i].body
+
+        if isinstance(block, SimpleStatementSuite):
+            block = IndentedBlock(body=[SimpleStatementLine(body=block.body)])
+
+        body[i] = body[i].with_changes(
+            body=block.with_changes(body=[*block.body, *funcs])
+        )
+
+    return module.with_changes(
+        body=[*body, *(libcst.parse_statement(text) for text in nodes)]
+    ).code
@@ -1,13 +1,26 @@
 import os
-import re
+import sys
 from importlib.util import find_spec
-from pathlib import Path
-from typing import Generator, Optional, Union
-
-from libcst import ClassDef, FunctionDef, Lambda
+from typing import (
+    TYPE_CHECKING,
+    Generator,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
+from .discovery import Discovery
 from .utils import Serializable, catch_module_from_sys, immutable
 
+if TYPE_CHECKING:
+    from libcst import ClassDef, FunctionDef
+
+FUNCTION = "function"
+CLASS = "class"
+METHOD = "method"
+
 
 @immutable
 class ModuleIO(Serializable):
@@ -29,17 +42,23 @@ class ModuleIO(Serializable):
         if (spec is None) or (spec.origin is None) or (not os.path.isfile(spec.origin)):
             return None
 
+        return cls.from_path(modname, spec.origin, outdir, head=head)
+
+    @classmethod
+    def from_path(
+        cls, modname: str, src: str, outdir: str, head: str = None
+    ) -> "ModuleIO":
         outdir = os.path.normpath(outdir)
         head = head or modname
 
-        src = spec.origin
         if src.endswith("__init__.py"):
             pfx = modname
             base = "__init__"
         else:
             pfx, base = modname.rsplit(".", 1) if "." in modname else ("", modname)
 
-        pfx = re.sub(rf"^{head}\.?", "", pfx)
+        if pfx == head or pfx.startswith(f"{head}."):
+            pfx = pfx[len(head) + 1 :]
 
         dst = os.path.join(
             outdir,
@@ -50,27 +69,86 @@ class ModuleIO(Serializable):
 
         return cls(name=modname, outdir=outdir, src=src, dst=dst)
 
-    def iter_submodules(self, head: str = None) -> Generator["ModuleIO", None, None]:
-        if self.ispkg:
-            prefix = os.path.dirname(self.src)
+    @classmethod
+    def locate(
+        cls, modname: str, outdir: str, head: str = None
+    ) -> Optional["ModuleIO"]:
+        """Resolve a module from "sys.path" by its file layout, without importing."""
+
+        parts = modname.split(".")
+
+        for entry in sys.path:
+            if not isinstance(entry, str):
+                continue
+
+            base = os.path.join(os.path.abspath(entry or os.curdir), *parts)
+
+            for src in (os.path.join(base, "__init__.py"), f"{base}.py"):
+                if os.path.isfile(src):
+                    return cls.from_path(modname, src, outdir, head=head)
+
+        return None
+
+    def iter_submodules(
+        self,
+        head: str = None,
+        resolve_imports: bool = False,
+        discovery: Optional[Discovery] = None,
+    ) -> Generator["ModuleIO", None, None]:
+        if not self.ispkg:
+            yield self
+            return
 
-            for p in Path(prefix).glob("**/*.py"):
-                path = str(p)
-                if path.endswith("__init__.py"):
-                    path = os.path.dirname(path)
+        prefix = os.path.dirname(self.src)
+        head = head or self.name
 
-                suffix = re.sub(rf"^{prefix}", "", path)
-                sub = os.path.splitext(suffix)[0]
+        discovery = Discovery(gitignore=False) if discovery is None else discovery
 
-                name = self.name + sub.replace(os.path.sep, ".")
-                head = head or self.name
-                mod = self.from_name(name, self.outdir, head=head)
+        for dirpath, _, filenames in discovery.walk(prefix):
+            rel = os.path.relpath(dirpath, prefix)
+            parts = [] if rel == os.curdir else rel.split(os.path.sep)
+
+            for fname in filenames:
+                stem, ext = os.path.splitext(fname)
+
+                if ext != ".py" or not stem.isidentifier():
+                    continue
+
+                name = ".".join(
+                    [self.name, *parts, *([] if stem == "__init__" else [stem])]
+                )
+
+                if resolve_imports:
+                    mod = self.from_name(name, self.outdir, head=head)
+                else:
+                    mod = self.from_path(
+                        name, os.path.join(dirpath, fname), self.outdir, head=head
+                    )
 
                 if mod:
                     yield mod
 
-        else:
-            yield self
+    def submodule(self, path: str, head: str = None) -> Optional["ModuleIO"]:
+        """Map a file path (existing or not) to the submodule it would define."""
+
+        path = os.path.abspath(path)
+
+        if not self.ispkg:
+            return self if path == os.path.abspath(self.src) else None
+
+        rel = os.path.relpath(path, os.path.dirname(os.path.abspath(self.src)))
+        stem, ext = os.path.splitext(rel)
+        parts = stem.split(os.path.sep)
+
+        if ext != ".py" or not all(p.isidentifier() for p in parts):
+            return None
+
+        if parts[-1] == "__init__":
+            parts.pop()
+
+        return self.from_path(
+            ".".join([self.name, *parts]), path, self.outdir, head=head or self.name
+        )
 
     @property
     def ispkg(self):
@@ -78,6 +156,118 @@ class ModuleIO(Serializable):
 
 
 @immutable
-class Code(Serializable):
-    module: Optional[ModuleIO] = None
-    cst: Union[FunctionDef, Lambda, ClassDef]
+class Generated(Serializable):
+    module: ModuleIO
+    source: Optional[str] = None
+    qualnames: Tuple[str, ...] = ()
+    stale: Tuple[str, ...] = ()
+    error: Optional[str] = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+
+class Symbol(NamedTuple):
+    """Compact record of a function, class or method, free of CST nodes.
+
+    Methods share the line span of their class.
+    """
+
+    qualname: str
+    name: str
+    kind: str
+    lineno: int
+    end_lineno: int
+    methods: Tuple[str, ...] = ()
+    decorators: Tuple[str, ...] = ()
+
+    def method(self, name: str) -> "Symbol":
+        return Symbol(
+            qualname=f"{self.qualname}.{name}",
+            name=name,
+            kind=METHOD,
+            lineno=self.lineno,
+            end_lineno=self.end_lineno,
+        )
+
+
+class Code:
+    """A symbol to build a template for, with the lines of its module.
+
+    Still takes the `cst` of the former records, `Code(module=..., cst=...)`
+    and `evolve(cst=...)` keep working for custom layouts.
+    """
+
+    __slots__ = ("module", "symbol", "lines", "_cst", "_parent")
+
+    def __init__(
+        self,
+        module: Optional[ModuleIO] = None,
+        symbol: Optional[Symbol] = None,
+        lines: Sequence[str] = (),
+        cst: Optional[Union["FunctionDef", "ClassDef"]] = None,
+        parent: Optional["Code"] = None,
+    ):
+        self.module = module
+        self.symbol = symbol
+        self.lines = lines
+        self._cst = cst
+        self._parent = parent
+
+    @property
+    def name(self) -> str:
+        return self.symbol.name if self.symbol is not None else self.cst.name.value
+
+    @property
+    def cst(self) -> Union["FunctionDef", "ClassDef"]:
+        """libcst node of the symbol, parsed from `lines` on first access."""
+
+        if self._cst is None:
+            from .scanner import load_cst
+
+            if self.symbol.kind != METHOD:
+                self._cst = load_cst(self.lines, self.symbol)
+
+            else:
+                # NOTE: methods share the parsed class of the code they come from
+                cls = (
+                    self._parent.cst
+                    if self._parent is not None
+                    else load_cst(self.lines, self.symbol)
+                )
+                self._cst = [
+                    el
+                    for el in cls.body.body
+                    if getattr(el, "name", None) is not None
+                    and el.name.value == self.symbol.name
+                ][-1]
+
+        return self._cst
+
+    def method(self, name: str) -> "Code":
+        return Code(self.module, self.symbol.method(name), self.lines, parent=self)
+
+    def evolve(self, **changes) -> "Code":
+        fields = dict(
+            module=self.module,
+            symbol=self.symbol,
+            lines=self.lines,
+            cst=self._cst,
+            parent=self._parent,
+        )
+
+        if "symbol" in changes and "cst" not in changes:
+            fields["cst"] = None
+
+        elif "cst" in changes and "symbol" not in changes:
+            name = changes["cst"].name.value
+            fields["symbol"] = (
+                self.symbol.method(name)
+                if self.symbol is not None and self.symbol.kind == CLASS
+                else None
+            )
+
+        fields.update(changes)
+
+        return Code(**fields)
@@ -0,0 +1,178 @@
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Dict
+from typing import List as LIST
+from typing import Optional, Tuple, Type
+
+import click
+
+from .model import ModuleIO
+
+if TYPE_CHECKING:
+    from .generator import Messages
+
+# NOTE: (label, label style, target style) of the line printed per module
+STATUS_LINES: Dict[str, Tuple[str, Dict, Dict]] = {
+    "written": ("writing: ", dict(fg="bright_white"), dict(fg="bright_green")),
+    "unchanged": (
+        "unchanged, skip writing: ",
+        dict(fg="bright_white"),
+        dict(fg="bright_black"),
+    ),
+    "dryrun": ("(dryrun) writing: ", dict(fg="bright_yellow"), dict(fg="bright_black")),
+    "orphaned": (
+        "source deleted, orphaned: ",
+        dict(fg="bright_white"),
+        dict(fg="bright_yellow"),
+    ),
+    "pruned": (
+        "source deleted, removing: ",
+        dict(fg="bright_white"),
+        dict(fg="bright_red"),
+    ),
+    "trimmed": (
+        "source deleted, removing generated tests: ",
+        dict(fg="bright_white"),
+        dict(fg="bright_red"),
+    ),
+}
+
+
+class Progress:
+    """Verbose progress, every message of every module.
+
+    Output is buffered and written in batches of `batch` chunks, or when
+    `flush` is called. With `err`, it goes to stderr.
+    """
+
+    detail = True
+    lines = True
+
+    def __init__(self, batch: int = 256, err: bool = False):
+        self.batch = batch
+        self.err = err
+        self.total = 0
+        self.counts = Counter()
+        self._buffer: LIST[str] = []
+
+    def write(self, text: str):
+        self._buffer.append(text)
+
+        if len(self._buffer) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            click.echo("".join(self._buffer), nl=False, err=self.err)
+            self._buffer.clear()
+
+    def secho(self, message: str = "", nl=True, **styles):
+        self.write(
+            (click.style(message, **styles) if styles else message)
+            + ("\n" if nl else "")
+        )
+
+    def start(self, total: int):
+        self.total += total
+
+    def messages(self, echo: "Messages"):
+        text = echo.render(self.detail)
+
+        if text:
+            self.write(text)
+
+    def done(self, mod: ModuleIO, status: str):
+        self.counts[status] += 1
+
+        if self.lines and status in STATUS_LINES:
+            label, label_style, target_style = STATUS_LINES[status]
+            self.secho(label, nl=False, **label_style)
+            self.secho(mod.dst, **target_style)
+
+    def finish(self):
+        self.flush()
+
+
+class LineProgress(Progress):
+    """One line per module, warnings and errors only."""
+
+    detail = False
+
+
+class SummaryProgress(LineProgress):
+    """Warnings and errors, and a summary line of module statuses at the end."""
+
+    lines = False
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{num} {status}" for status, num in self.counts.items())
+
+        return f"{sum(self.counts.values())} module(s)" + (
+            f": {counts}" if counts else ""
+        )
+
+    def finish(self):
+        self.secho(self.summary(), fg="bright_white")
+        super().finish()
+
+
+class BarProgress(SummaryProgress):
+    """Live progress bar, redrawn at most once per `interval` seconds."""
+
+    def __init__(
+        self,
+        batch: int = 256,
+        err: bool = False,
+        width: int = 30,
+        interval: float = 0.1,
+    ):
+        super().__init__(batch, err)
+        self.width = width
+        self.interval = interval
+        self._drawn: Optional[float] = None
+
+    def bar(self) -> str:
+        num = sum(self.counts.values())
+        filled = self.width * num // self.total if self.total else self.width
+
+        return f"[{'#' * filled}{'-' * (self.width - filled)}] {num}/{self.total}"
+
+    def draw(self, force: bool = False):
+        now = time.monotonic()
+
+        if force or self._drawn is None or now - self._drawn >= self.interval:
+            self._drawn = now
+            self.write(f"\r\033[K{self.bar()}")
+            self.flush()
+
+    def messages(self, echo: "Messages"):
+        text = echo.render(self.detail)
+
+        if text:
+            self.write(f"\r\033[K{text}")
+            self._drawn = None
+
+    def done(self, mod: ModuleIO, status: str):
+        super().done(mod, status)
+        self.draw()
+
+    def finish(self):
+        self.draw(force=True)
+        self.write("\n")
+        super().finish()
+
+
+class QuietProgress(SummaryProgress):
+    """No output at all."""
+
+    def write(self, text: str):
+        pass
+
+
+PROGRESS: Dict[str, Type[Progress]] = {
+    "verbose": Progress,
+    "lines": LineProgress,
+    "bar": BarProgress,
+    "summary": SummaryProgress,
+    "quiet": QuietProgress,
+}
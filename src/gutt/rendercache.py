@@ -0,0 +1,155 @@
+import json
+import os
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional
+
+from .model import CLASS, Code
+from .utils import makefile
+
+RENDER_CACHE_NAME = ".gutt-render-cache.json"
+RENDER_CACHE_VERSION = 1
+RENDER_CACHE_SIZE = 8 * 1024 * 1024
+
+
+class Snippet:
+    """Source text of one template, `formatted` once it went through the formatter."""
+
+    __slots__ = ("key", "text", "formatted")
+
+    def __init__(self, key: Optional[str], text: str, formatted: bool = False):
+        self.key = key
+        self.text = text
+        self.formatted = formatted
+
+
+@lru_cache(maxsize=None)
+def _format_config(formatter: str, cwd: str) -> str:
+    """Fingerprint of the formatter setup, black reads its options from the
+    nearest "pyproject.toml" up to the project root.
+    """
+
+    import hashlib
+
+    if formatter == "none":
+        return formatter
+
+    path = cwd
+    while True:
+        pyproject = os.path.join(path, "pyproject.toml")
+
+        if os.path.isfile(pyproject):
+            with open(pyproject, "rb") as f:
+                return f"{formatter}:{hashlib.sha1(f.read()).hexdigest()}"
+
+        if any(os.path.exists(os.path.join(path, d)) for d in (".git", ".hg")):
+            return formatter
+
+        path, prev = os.path.dirname(path), path
+
+        if path == prev:
+            return formatter
+
+
+def render_key(Template: type, layout: type, code: Code, formatter: str) -> str:
+    """Key of the formatted template of `code`, from the template and layout
+    classes (and their `version`), the formatter setup and the symbol
+    signature.
+    """
+
+    import hashlib
+
+    from gutt import __version__
+
+    symbol = code.symbol
+    signature = [symbol.kind, symbol.name, code.module.name]
+
+    if symbol.kind == CLASS:
+        signature.extend(symbol.methods)
+
+    parts = [
+        __version__,
+        f"{Template.__module__}.{Template.__qualname__}",
+        str(getattr(Template, "version", "")),
+        f"{layout.__module__}.{layout.__qualname__}",
+        str(getattr(layout, "version", "")),
+        _format_config(formatter, os.getcwd()),
+        *signature,
+    ]
+
+    return hashlib.sha1("\0".join(parts).encode()).hexdigest()
+
+
+class RenderCache:
+    """Formatted templates by `render_key`, persisted in the output directory.
+
+    The least recently used entries are evicted once the texts take more
+    than `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: int = RENDER_CACHE_SIZE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.entries: Dict[str, str] = OrderedDict()
+        self.added: Dict[str, str] = {}
+        self._size = 0
+
+    @classmethod
+    def load(cls, outdir: str, max_bytes: int = RENDER_CACHE_SIZE) -> "RenderCache":
+        cache = cls(os.path.join(outdir, RENDER_CACHE_NAME), max_bytes)
+
+        try:
+            with open(cache.path, "r") as f:
+                data = json.load(f)
+
+        except (FileNotFoundError, ValueError):
+            return cache
+
+        if data.get("version") == RENDER_CACHE_VERSION:
+            cache.update(data.get("entries", {}))
+
+        return cache
+
+    def get(self, key: str) -> Optional[str]:
+        text = self.entries.get(key)
+
+        if text is not None:
+            self.entries.move_to_end(key)
+
+        return text
+
+    def _store(self, key: str, text: str):
+        if key in self.entries:
+            self._size -= len(self.entries[key])
+
+        self.entries[key] = text
+        self.entries.move_to_end(key)
+        self._size += len(text)
+
+        while self._size > self.max_bytes and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def put(self, key: str, text: str):
+        self._store(key, text)
+        self.added[key] = text
+
+    def update(self, entries: Dict[str, str]):
+        """Merge entries drained from another process."""
+
+        for key, text in entries.items():
+            self._store(key, text)
+
+    def drain(self) -> Dict[str, str]:
+        """Entries put since the last call, to ship them to another process."""
+
+        added, self.added = self.added, {}
+
+        return added
+
+    def save(self):
+        content = json.dumps(
+            {"version": RENDER_CACHE_VERSION, "entries": self.entries}, indent=1
+        )
+
+        makefile(self.path, content, overwrite=True)
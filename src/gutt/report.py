@@ -0,0 +1,78 @@
+import json
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Dict
+
+from .model import ModuleIO
+
+PHASES = ("discovery", "parse_src", "parse_dst", "build", "merge", "format", "write")
+REPORTS = ("json",)
+
+
+class Stats:
+    """Accumulated phase timings (in seconds) and counters."""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.counts = Counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.timings[name] = (
+                self.timings.get(name, 0.0) + time.perf_counter() - start
+            )
+
+    def count(self, name: str, num: int = 1):
+        self.counts[name] += num
+
+    def merge(self, other: "Stats"):
+        for name, sec in other.timings.items():
+            self.timings[name] = self.timings.get(name, 0.0) + sec
+
+        self.counts.update(other.counts)
+
+    def to_dict(self) -> Dict:
+        return {
+            "timings": {p: round(self.timings.get(p, 0.0), 6) for p in PHASES},
+            "counters": dict(sorted(self.counts.items())),
+        }
+
+
+class RunReport:
+    """Per-module and aggregated statistics of a run."""
+
+    def __init__(self):
+        self.total = Stats()
+        self.modules = OrderedDict()
+        self._start = time.perf_counter()
+
+    def add(self, mod: ModuleIO, status: str, stats: Stats = None):
+        stats = stats or Stats()
+
+        self.total.merge(stats)
+        self.total.count(f"modules_{status}")
+
+        self.modules[mod.name] = dict(
+            status=status, src=mod.src, dst=mod.dst, **stats.to_dict()
+        )
+
+    def to_dict(self) -> Dict:
+        total = self.total.to_dict()
+
+        return dict(
+            elapsed=round(time.perf_counter() - self._start, 6),
+            timings=total["timings"],
+            counters=total["counters"],
+            modules=list(
+                dict(name=name, **record) for name, record in self.modules.items()
+            ),
+        )
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
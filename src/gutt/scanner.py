@@ -0,0 +1,84 @@
+import ast
+import io
+from collections import OrderedDict
+from typing import Dict, List, Union
+
+import libcst
+from libcst import BaseCompoundStatement
+
+from .model import CLASS, FUNCTION, Symbol
+
+_Def = Union[ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef]
+
+
+def _span(node: _Def):
+    start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+
+    return start, node.end_lineno
+
+
+def _source_segment(lines: List[str], node: ast.expr) -> str:
+    """Same as `ast.get_source_segment`, from already split lines."""
+
+    # NOTE: column offsets count utf-8 bytes
+    first = lines[node.lineno - 1].encode()
+    last = lines[node.end_lineno - 1].encode()
+
+    if node.lineno == node.end_lineno:
+        return first[node.col_offset : node.end_col_offset].decode()
+
+    return "".join(
+        [
+            first[node.col_offset :].decode(),
+            *lines[node.lineno : node.end_lineno - 1],
+            last[: node.end_col_offset].decode(),
+        ]
+    )
+
+
+def scan(source: str, modname: str) -> Dict[str, Symbol]:
+    """Collect top-level functions and classes with the stdlib "ast" parser."""
+
+    symbols = OrderedDict()
+    lines = splitlines(source)
+
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            kind, methods = FUNCTION, ()
+
+        elif isinstance(node, ast.ClassDef):
+            kind = CLASS
+            methods = tuple(
+                el.name
+                for el in node.body
+                if isinstance(el, (ast.FunctionDef, ast.AsyncFunctionDef))
+            )
+
+        else:
+            continue
+
+        lineno, end_lineno = _span(node)
+        qualname = f"{modname}.{node.name}"
+
+        symbols[qualname] = Symbol(
+            qualname=qualname,
+            name=node.name,
+            kind=kind,
+            lineno=lineno,
+            end_lineno=end_lineno,
+            methods=methods,
+            decorators=tuple(_source_segment(lines, d) for d in node.decorator_list),
+        )
+
+    return symbols
+
+
+def splitlines(source: str) -> List[str]:
+    # NOTE: str.splitlines also breaks on "\f", "\v", ... unlike the tokenizer
+    return io.StringIO(source, newline=None).readlines()
+
+
+def load_cst(lines: List[str], symbol: Symbol) -> BaseCompoundStatement:
+    """Parse only the source segment of the symbol into a libcst node."""
+
+    return libcst.parse_statement("".join(lines[symbol.lineno - 1 : symbol.end_lineno]))
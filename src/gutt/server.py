@@ -0,0 +1,256 @@
+import json
+import os
+import socketserver
+import sys
+from typing import IO, Dict
+from typing import List as LIST
+from typing import Optional
+
+from .filters import QualnameFilter
+from .generator import generate_module
+from .model import ModuleIO
+from .report import Stats
+from .template import Template as T
+from .utils import LRUCache, makefile, populate_init
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class RPCError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def modname_from_path(path: str) -> Optional[str]:
+    """Derive the dotted module name of a file from its enclosing packages."""
+
+    path = os.path.abspath(path)
+    dirpath, fname = os.path.split(path)
+    stem, ext = os.path.splitext(fname)
+
+    if ext != ".py":
+        return None
+
+    parts = [] if stem == "__init__" else [stem]
+
+    while os.path.isfile(os.path.join(dirpath, "__init__.py")):
+        dirpath, name = os.path.split(dirpath)
+        parts.insert(0, name)
+
+    return ".".join(parts) or None
+
+
+def _error(rid, code: int, message: str) -> Dict:
+    return {"jsonrpc": "2.0", "id": rid, "error": {"code": code, "message": message}}
+
+
+class Server:
+    """JSON-RPC 2.0 worker which keeps the template, the formatter and the
+    parsed modules warm between requests.
+
+    Methods:
+        generate(modules, recursive=False): regenerate modules by name
+        generate_files(paths): regenerate the modules of source files
+        ping(), shutdown()
+    """
+
+    METHODS = ("generate", "generate_files", "ping", "shutdown")
+
+    def __init__(
+        self,
+        Template: T,
+        output: str,
+        qfilter: Optional[QualnameFilter] = None,
+        formatter: str = "inproc",
+        format_scope: str = "file",
+        flatten: bool = False,
+        dryrun: bool = False,
+        cache_size: int = 1024,
+    ):
+        self.Template = Template
+        self.output = output
+        self.qfilter = qfilter
+        self.formatter = formatter
+        self.format_scope = format_scope
+        self.flatten = flatten
+        self.dryrun = dryrun
+        self.cache = LRUCache(cache_size)
+        self.running = True
+
+    def _resolve(self, modname: str) -> ModuleIO:
+        head = self._head(modname)
+        mod = ModuleIO.locate(modname, self.output, head) or ModuleIO.from_name(
+            modname, self.output, head
+        )
+
+        if mod is None:
+            raise RPCError(INVALID_PARAMS, f"module not found: {modname}")
+
+        return mod
+
+    def _head(self, modname: str) -> str:
+        return "" if self.flatten else modname.split(".")[0]
+
+    def _run(self, mods: LIST[ModuleIO]) -> LIST[Dict]:
+        results, created = [], set()
+
+        for mod in mods:
+            stats = Stats()
+            result = generate_module(
+                mod,
+                self.Template,
+                qfilter=self.qfilter,
+                formatter=self.formatter,
+                format_scope=self.format_scope,
+                cache=self.cache,
+                stats=stats,
+            )
+
+            written = False
+            if result.source is not None and not self.dryrun:
+                dirpath = os.path.dirname(mod.dst)
+                if not os.path.isdir(dirpath):
+                    created.add(dirpath)
+
+                with stats.phase("write"):
+                    written = makefile(mod.dst, result.source, overwrite=True)
+
+            results.append(
+                dict(
+                    name=mod.name,
+                    src=mod.src,
+                    dst=mod.dst,
+                    written=written,
+                    error=result.error,
+                    **stats.to_dict(),
+                )
+            )
+
+        if created:
+            populate_init(self.output, created)
+
+        return results
+
+    def generate(self, modules: LIST[str], recursive: bool = False) -> LIST[Dict]:
+        mods = []
+        for modname in modules:
+            mod = self._resolve(modname)
+            mods.extend(
+                mod.iter_submodules(self._head(modname)) if recursive else [mod]
+            )
+
+        return self._run(mods)
+
+    def generate_files(self, paths: LIST[str]) -> LIST[Dict]:
+        mods = []
+        for path in paths:
+            modname = modname_from_path(path)
+
+            if modname is None:
+                raise RPCError(INVALID_PARAMS, f"not a python module: {path}")
+
+            mods.append(self._resolve(modname))
+
+        return self._run(mods)
+
+    def ping(self) -> str:
+        return "pong"
+
+    def shutdown(self) -> bool:
+        self.running = False
+
+        return True
+
+    def _dispatch(self, method: str, params):
+        if method not in self.METHODS:
+            raise RPCError(METHOD_NOT_FOUND, f"method not found: {method}")
+
+        params = params or {}
+
+        try:
+            if isinstance(params, list):
+                return getattr(self, method)(*params)
+
+            return getattr(self, method)(**params)
+
+        except TypeError as error:
+            raise RPCError(INVALID_PARAMS, str(error))
+
+    def handle(self, request: Dict) -> Optional[Dict]:
+        if not isinstance(request, dict) or "method" not in request:
+            return _error(None, INVALID_REQUEST, "invalid request")
+
+        rid = request.get("id")
+
+        try:
+            result = self._dispatch(request["method"], request.get("params"))
+
+        except RPCError as error:
+            response = _error(rid, error.code, error.message)
+
+        except Exception as error:
+            response = _error(rid, INTERNAL_ERROR, f"{type(error).__name__}: {error}")
+
+        else:
+            response = {"jsonrpc": "2.0", "id": rid, "result": result}
+
+        # NOTE: a request without id is a notification, nothing to reply
+        return response if "id" in request else None
+
+    def handle_line(self, line: str) -> Optional[str]:
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            response = _error(None, PARSE_ERROR, str(error))
+        else:
+            response = self.handle(request)
+
+        return None if response is None else json.dumps(response)
+
+    def serve_stdio(self, stdin: IO = None, stdout: IO = None):
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+
+        for line in stdin:
+            if not line.strip():
+                continue
+
+            response = self.handle_line(line)
+
+            if response is not None:
+                stdout.write(response + "\n")
+                stdout.flush()
+
+            if not self.running:
+                break
+
+    def serve_unix(self, address: str):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for raw in self.rfile:
+                    response = server.handle_line(raw.decode())
+
+                    if response is not None:
+                        self.wfile.write((response + "\n").encode())
+                        self.wfile.flush()
+
+                    if not server.running:
+                        break
+
+        if os.path.exists(address):
+            os.unlink(address)
+
+        with socketserver.UnixStreamServer(address, Handler) as sock:
+            try:
+                while self.running:
+                    sock.handle_request()
+            finally:
+                os.unlink(address)
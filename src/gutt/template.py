@@ -1,5 +1,9 @@
 import dataclasses
+import textwrap
+from functools import lru_cache
+from typing import Dict, Iterator
 from typing import List as LIST
+from typing import Optional, Tuple
 
 from libcst import (
     Assert,
@@ -22,35 +26,100 @@ from libcst import (
 from .model import Code
 from .utils import load_module_by_name
 
+BACKENDS = ("cst", "text")
+
+
+@lru_cache(maxsize=None)
+def _layout_fields(ref: type) -> Tuple[str, ...]:
+    return tuple(f.name for f in dataclasses.fields(ref))
+
+
+# NOTE: libcst nodes are immutable, the fragments below are shared by all templates
+@lru_cache(maxsize=1024)
+def _module_expr(modname: str):
+    return parse_expression(modname)
+
+
+@lru_cache(maxsize=None)
+def _params(*names: str) -> Parameters:
+    return Parameters(params=tuple(Param(Name(value=n)) for n in names))
+
+
+@lru_cache(maxsize=None)
+def _decorator(name: str) -> Decorator:
+    return Decorator(decorator=Name(value=name))
+
+
+@lru_cache(maxsize=None)
+def _pass_block() -> IndentedBlock:
+    return IndentedBlock(body=(SimpleStatementLine(body=(Pass(),)),))
+
+
+@lru_cache(maxsize=None)
+def _fixture(name: str, params: Tuple[str, ...], decorator: str = None) -> FunctionDef:
+    return FunctionDef(
+        name=Name(value=name),
+        params=_params(*params),
+        body=_pass_block(),
+        decorators=(_decorator(decorator),) if decorator else (),
+    )
+
 
 class Layout:
     """TODO: What is this"""
 
     prefix = "Test"
     ref = CSTNode
+    # NOTE: bump when the output changes, to invalidate "--render-cache" entries
+    version = 1
+    # NOTE: "str.format" template of the black formatted output of `build`,
+    # used by the "text" backend. Only the class defining it uses it, a
+    # subclass changing the built fields goes through libcst unless it
+    # defines its own.
+    text_template: Optional[str] = None
 
     def __init__(self, code: Code):
         self._code = code
 
     def build(self) -> CSTNode:
-        fields = {f.name for f in dataclasses.fields(self.ref)}
-
-        params = {fd: getattr(self, fd) for fd in fields if hasattr(self, fd)}
+        # NOTE: fields are looked up on the instance, layouts may set them in
+        # `__init__`, errors raised by their properties are not swallowed
+        params = {
+            fd: getattr(self, fd)
+            for fd in _layout_fields(self.ref)
+            if fd in vars(self) or hasattr(type(self), fd)
+        }
 
         return self.ref(**params)
 
+    def text_fields(self) -> Optional[Dict[str, str]]:
+        return dict(
+            prefix=self.prefix, name=self._code.name, module=self._code.module.name
+        )
+
+    def text(self) -> Optional[str]:
+        """Formatted source of `build`, None without a text template."""
+
+        template = type(self).__dict__.get("text_template")
+        fields = self.text_fields() if template is not None else None
+
+        return None if fields is None else template.format_map(fields)
+
 
 class FunctionLayout(Layout):
     prefix = "test_"
     ref = FunctionDef
+    text_template = (
+        "def {prefix}{name}():\n" "    from {module} import {name}\n" "\n" "    pass\n"
+    )
 
     @property
     def name(self) -> Name:
-        return Name(value=f"{self.prefix}{self._code.cst.name.value}")
+        return Name(value=f"{self.prefix}{self._code.name}")
 
     @property
     def params(self) -> Parameters:
-        return Parameters()
+        return _params()
 
     @property
     def body(self) -> BaseSuite:
@@ -59,10 +128,8 @@ class FunctionLayout(Layout):
                 SimpleStatementLine(
                     body=[
                         ImportFrom(
-                            module=parse_expression(self._code.module.name),
-                            names=[
-                                ImportAlias(name=Name(value=self._code.cst.name.value))
-                            ],
+                            module=_module_expr(self._code.module.name),
+                            names=[ImportAlias(name=Name(value=self._code.name))],
                         )
                     ]
                 ),
@@ -72,26 +139,45 @@ class FunctionLayout(Layout):
 
 
 class MethodLayout(FunctionLayout):
+    text_template = "def {prefix}{name}(self):\n    pass\n"
+
     @property
     def body(self) -> BaseSuite:
-        return IndentedBlock(body=[SimpleStatementLine(body=[Pass()])])
+        return _pass_block()
 
     @property
     def params(self) -> Parameters:
-        return Parameters(params=[Param(Name(value="self"))])
+        return _params("self")
 
 
 class ClassLayout(Layout):
     prefix = "Test"
     ref = ClassDef
     method_layout = MethodLayout
+    text_template = (
+        "class {prefix}{name}:\n"
+        "    @classmethod\n"
+        "    def setup_class(cls):\n"
+        "        from {module} import {name}\n"
+        "\n"
+        "        assert {name}\n"
+        "\n"
+        "    @classmethod\n"
+        "    def teardown_class(cls):\n"
+        "        pass\n"
+        "\n"
+        "    def setup_method(self, method):\n"
+        "        pass\n"
+        "\n"
+        "    def teardown_method(self, method):\n"
+        "        pass\n"
+        "{methods}"
+    )
 
     @property
     def setups_teardowns(self) -> LIST[FunctionDef]:
         """TODO: what is this"""
 
-        cls_params = Parameters(params=[Param(Name(value="cls"))])
-        cls_deco = Decorator(decorator=Name(value="classmethod"))
         setup_class = FunctionDef(
             name=Name(value="setup_class"),
             body=IndentedBlock(
@@ -99,65 +185,51 @@ class ClassLayout(Layout):
                     SimpleStatementLine(
                         body=[
                             ImportFrom(
-                                module=parse_expression(self._code.module.name),
-                                names=[
-                                    ImportAlias(
-                                        name=Name(value=self._code.cst.name.value)
-                                    )
-                                ],
+                                module=_module_expr(self._code.module.name),
+                                names=[ImportAlias(name=Name(value=self._code.name))],
                             )
                         ]
                     ),
                     SimpleStatementLine(
                         body=[
-                            Assert(test=Name(value=self._code.cst.name.value)),
+                            Assert(test=Name(value=self._code.name)),
                         ]
                     ),
                 ]
             ),
-            params=cls_params,
-            decorators=[cls_deco],
+            params=_params("cls"),
+            decorators=[_decorator("classmethod")],
         )
 
-        teardown_class = FunctionDef(
-            name=Name(value="teardown_class"),
-            params=cls_params,
-            body=IndentedBlock(body=[SimpleStatementLine(body=[Pass()])]),
-            decorators=[cls_deco],
-        )
-
-        self_params = Parameters(
-            params=[Param(Name(value="self")), Param(Name(value="method"))]
-        )
-
-        setup_method = FunctionDef(
-            name=Name(value="setup_method"),
-            params=self_params,
-            body=IndentedBlock(body=[SimpleStatementLine(body=[Pass()])]),
-        )
-
-        teardown_method = FunctionDef(
-            name=Name(value="teardown_method"),
-            params=self_params,
-            body=IndentedBlock(body=[SimpleStatementLine(body=[Pass()])]),
-        )
+        teardown_class = _fixture("teardown_class", ("cls",), "classmethod")
+        setup_method = _fixture("setup_method", ("self", "method"))
+        teardown_method = _fixture("teardown_method", ("self", "method"))
 
         return [setup_class, teardown_class, setup_method, teardown_method]
 
+    def _method_layouts(self) -> Iterator[MethodLayout]:
+        for name in self._code.symbol.methods:
+            if not name.startswith("__"):
+                yield self.method_layout(self._code.method(name))
+
     @property
     def methods(self) -> LIST[FunctionDef]:
-        methods = []
-        for stmt in self._code.cst.body.body:
-            if (isinstance(stmt, FunctionDef)) and (
-                not stmt.name.value.startswith("__")
-            ):
-                methods.append(self.method_layout(self._code.evolve(cst=stmt)).build())
+        return [layout.build() for layout in self._method_layouts()]
+
+    def text_fields(self) -> Optional[Dict[str, str]]:
+        methods = [layout.text() for layout in self._method_layouts()]
+
+        if None in methods:
+            return None
 
-        return methods
+        return dict(
+            super().text_fields(),
+            methods="".join(f"\n{textwrap.indent(m, ' ' * 4)}" for m in methods),
+        )
 
     @property
     def name(self) -> Name:
-        return Name(value=f"{self.prefix}{self._code.cst.name.value}")
+        return Name(value=f"{self.prefix}{self._code.name}")
 
     @property
     def body(self) -> BaseSuite:
@@ -169,6 +241,11 @@ class Template:
 
     class_layout = ClassLayout
     function_layout = FunctionLayout
+    # NOTE: bump when the output changes, to invalidate "--render-cache" entries
+    version = 1
+    # NOTE: "text" renders from the layouts' text templates where they have
+    # one, "cst" always builds and formats the libcst nodes
+    backend = "text"
 
     @classmethod
     def load(cls, name: str) -> "Template":
@@ -182,6 +259,13 @@ class Template:
 
 
 class AssertFalseFunctionLayout(FunctionLayout):
+    text_template = (
+        "def {prefix}{name}():\n"
+        "    from {module} import {name}\n"
+        "\n"
+        "    assert False\n"
+    )
+
     @property
     def body(self) -> BaseSuite:
         return IndentedBlock(
@@ -189,10 +273,8 @@ class AssertFalseFunctionLayout(FunctionLayout):
                 SimpleStatementLine(
                     body=[
                         ImportFrom(
-                            module=parse_expression(self._code.module.name),
-                            names=[
-                                ImportAlias(name=Name(value=self._code.cst.name.value))
-                            ],
+                            module=_module_expr(self._code.module.name),
+                            names=[ImportAlias(name=Name(value=self._code.name))],
                         )
                     ]
                 ),
@@ -206,6 +288,13 @@ class AssertFalseFunctionLayout(FunctionLayout):
 
 
 class AssertSelfFunctionLayout(FunctionLayout):
+    text_template = (
+        "def {prefix}{name}():\n"
+        "    from {module} import {name}\n"
+        "\n"
+        "    assert {name}\n"
+    )
+
     @property
     def body(self) -> BaseSuite:
         return IndentedBlock(
@@ -213,16 +302,14 @@ class AssertSelfFunctionLayout(FunctionLayout):
                 SimpleStatementLine(
                     body=[
                         ImportFrom(
-                            module=parse_expression(self._code.module.name),
-                            names=[
-                                ImportAlias(name=Name(value=self._code.cst.name.value))
-                            ],
+                            module=_module_expr(self._code.module.name),
+                            names=[ImportAlias(name=Name(value=self._code.name))],
                         )
                     ]
                 ),
                 SimpleStatementLine(
                     body=[
-                        Assert(test=Name(value=self._code.cst.name.value)),
+                        Assert(test=Name(value=self._code.name)),
                     ]
                 ),
             ]
@@ -230,15 +317,18 @@ class AssertSelfFunctionLayout(FunctionLayout):
 
 
 class AssertFalseMethodLayout(MethodLayout):
+    text_template = "def {prefix}{name}(self):\n    assert False\n"
+
     @property
     def body(self):
         return IndentedBlock(
-            body=[SimpleStatementLine(body[Assert(test=Name(value="False"))])]
+            body=[SimpleStatementLine(body=[Assert(test=Name(value="False"))])]
         )
 
 
 class AssertFalseClassLayout(ClassLayout):
     method_layout = AssertFalseMethodLayout
+    text_template = ClassLayout.text_template
 
 
 class AssertFalseTemplate(Template):
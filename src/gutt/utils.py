@@ -2,16 +2,15 @@ import json
 import os
 import pathlib
 import pkgutil
-import subprocess as sp
 import sys
-import tempfile
+from collections import OrderedDict
 from contextlib import contextmanager
+from functools import lru_cache
 from importlib._bootstrap_external import SourceFileLoader
 from types import ModuleType
-from typing import Dict, Union
+from typing import Dict, Iterable, List, Optional, Union
 
 import attr
-import cattr
 
 immutable = attr.s(auto_attribs=True, slots=True, frozen=True, kw_only=True)
 
@@ -23,6 +22,8 @@ class Serializable:
 
     @classmethod
     def from_dict(cls, data: Dict):
+        import cattr
+
         return cattr.structure_attrs_fromdict(data, cls)
 
     @classmethod
@@ -56,33 +57,69 @@ def load_module_by_name(modname: str) -> ModuleType:
     return loader.load_module(modname)
 
 
-def blacking(source_code: str):
-    with tempfile.NamedTemporaryFile("w", delete=False) as f:
-        f.write(source_code)
-        fname = f.name
+FORMATTERS = ("inproc", "subprocess", "none")
+FORMAT_SCOPES = ("file", "fragments")
 
-    p = sp.Popen(["cat", fname], stdout=sp.PIPE)
 
-    out = sp.check_output([sys.executable, "-m", "black", "-q", "-"], stdin=p.stdout)
+@lru_cache(maxsize=None)
+def _black_mode():
+    import black
 
-    p.wait()
+    kwargs = {}
+    pyproject = black.find_pyproject_toml((os.getcwd(),))
+    config = black.parse_pyproject_toml(pyproject) if pyproject else {}
 
-    try:
-        pathlib.Path(fname).unlink()
-    except FileNotFoundError:
-        pass
+    if "line_length" in config:
+        kwargs["line_length"] = int(config["line_length"])
+
+    if "target_version" in config:
+        kwargs["target_versions"] = {
+            black.TargetVersion[v.upper()] for v in config["target_version"]
+        }
+
+    if "skip_string_normalization" in config:
+        kwargs["string_normalization"] = not config["skip_string_normalization"]
+
+    if "skip_magic_trailing_comma" in config:
+        kwargs["magic_trailing_comma"] = not config["skip_magic_trailing_comma"]
+
+    if "preview" in config:
+        kwargs["preview"] = bool(config["preview"])
+
+    return black.Mode(**kwargs)
+
+
+def text_width(formatter: str) -> Optional[int]:
+    """Line length text templates must fit in to match the output of
+    `formatter`, None if they can't be used with it.
+    """
+
+    if formatter == "none":
+        return None
+
+    mode = _black_mode()
+
+    return None if mode.preview else mode.line_length
 
-    return out.decode()
 
+@lru_cache(maxsize=None)
+def _isort_config():
+    import isort
+
+    return isort.Config(settings_path=os.getcwd())
+
+
+def _pipe_through(modname: str, source_code: str):
+    import subprocess as sp
+    import tempfile
 
-def isorting(source_code: str):
     with tempfile.NamedTemporaryFile("w", delete=False) as f:
         f.write(source_code)
         fname = f.name
 
     p = sp.Popen(["cat", fname], stdout=sp.PIPE)
 
-    out = sp.check_output([sys.executable, "-m", "isort", "-q", "-"], stdin=p.stdout)
+    out = sp.check_output([sys.executable, "-m", modname, "-q", "-"], stdin=p.stdout)
 
     p.wait()
 
@@ -94,6 +131,36 @@ def isorting(source_code: str):
     return out.decode()
 
 
+def blacking(source_code: str, formatter: str = "subprocess"):
+    if formatter == "none":
+        return source_code
+
+    if formatter == "inproc":
+        import black
+
+        return black.format_str(source_code, mode=_black_mode())
+
+    if formatter == "subprocess":
+        return _pipe_through("black", source_code)
+
+    raise ValueError(f"unknown formatter: {formatter}, expected one of {FORMATTERS}")
+
+
+def isorting(source_code: str, formatter: str = "subprocess"):
+    if formatter == "none":
+        return source_code
+
+    if formatter == "inproc":
+        import isort
+
+        return isort.code(source_code, config=_isort_config())
+
+    if formatter == "subprocess":
+        return _pipe_through("isort", source_code)
+
+    raise ValueError(f"unknown formatter: {formatter}, expected one of {FORMATTERS}")
+
+
 @contextmanager
 def expand_sys_path(*paths: str):
     num = len(paths)
@@ -108,25 +175,106 @@ def expand_sys_path(*paths: str):
         sys.path.pop(0)
 
 
-def makefile(fullpath: str, content: Union[str, bytes] = "", overwrite: bool = False):
+def makefile(
+    fullpath: str, content: Union[str, bytes] = "", overwrite: bool = False
+) -> bool:
+    """Write the file unless it exists, return whether it has been written.
+
+    With `overwrite`, an existing file is replaced only if its content differs.
+    """
+
     if not os.path.isfile(fullpath):
         dirpath = os.path.dirname(fullpath)
 
-        if not os.path.isdir(dirpath):
+        if dirpath and not os.path.isdir(dirpath):
             os.makedirs(dirpath)
 
         _writefile(fullpath, content)
 
-    elif overwrite:
+        return True
+
+    elif overwrite and not _samecontent(fullpath, content):
         _writefile(fullpath, content)
 
+        return True
+
+    return False
+
+
+def _samecontent(fullpath: str, content: Union[str, bytes]) -> bool:
+    if isinstance(content, bytes) and os.path.getsize(fullpath) != len(content):
+        return False
+
+    try:
+        with open(fullpath, "rb" if isinstance(content, bytes) else "r") as f:
+            return f.read() == content
+
+    except (OSError, UnicodeDecodeError):
+        return False
+
+
+@lru_cache(maxsize=None)
+def _umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+
+    return mask
+
 
 def _writefile(fullpath: str, content: Union[str, bytes] = ""):
     if not isinstance(content, (str, bytes)):
         raise TypeError(f"content must be str or bytes, got: {type(content)}")
 
-    with open(fullpath, "wb" if isinstance(content, bytes) else "w") as f:
-        f.write(content)
+    dirpath, fname = os.path.split(fullpath)
+
+    try:
+        mode = os.stat(fullpath).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o666 & ~_umask()
+
+    import tempfile
+
+    # NOTE: write to a sibling temp file then rename, so readers never see a partial file
+    fd, tmppath = tempfile.mkstemp(prefix=f".{fname}.", dir=dirpath or os.curdir)
+
+    try:
+        with open(fd, "wb" if isinstance(content, bytes) else "w") as f:
+            f.write(content)
+
+        os.chmod(tmppath, mode)
+        os.replace(tmppath, fullpath)
+
+    except BaseException:
+        try:
+            os.unlink(tmppath)
+        except FileNotFoundError:
+            pass
+
+        raise
+
+
+class WriteQueue:
+    """Collect file writes during a run and apply them at once with `flush`."""
+
+    def __init__(self):
+        self._files = OrderedDict()
+
+    def __len__(self):
+        return len(self._files)
+
+    def put(self, fullpath: str, content: Union[str, bytes] = "", overwrite=False):
+        self._files[fullpath] = (content, overwrite)
+
+    def flush(self) -> List[str]:
+        written = [
+            fullpath
+            for fullpath, (content, overwrite) in self._files.items()
+            if makefile(fullpath, content, overwrite=overwrite)
+        ]
+
+        self._files.clear()
+
+        return written
 
 
 @contextmanager
@@ -139,21 +287,65 @@ def catch_module_from_sys(modname: str):
         sys.modules[modname] = m
 
 
-def populate_init(folder: str):
+def populate_init(folder: str, dirs: Optional[Iterable[str]] = None):
+    """Create missing "__init__.py" in the output tree.
+
+    Without `dirs` the whole tree under `folder` is scanned, otherwise only
+    the given directories and their ancestors up to `folder` are visited.
+    """
+
     root = pathlib.Path(folder)
-    paths = {root}
 
-    for path in root.glob("**/*.py"):
-        if path.name == "__init__.py":
-            continue
+    if dirs is None:
+        paths = {root}
+
+        for path in root.glob("**/*.py"):
+            if path.name == "__init__.py":
+                continue
+
+            parent = path.parent
+
+            while parent > root:
+                if not parent.joinpath("__init__.py").exists():
+                    paths.add(parent)
 
-        parent = path.parent
+                parent = parent.parent
 
-        while parent > root:
-            if not parent.joinpath("__init__.py").exists():
-                paths.add(parent)
+    else:
+        paths = set()
 
-            parent = parent.parent
+        for d in dirs:
+            parent = pathlib.Path(d)
+
+            while parent == root or root in parent.parents:
+                if parent in paths:
+                    break
+
+                if not parent.joinpath("__init__.py").exists():
+                    paths.add(parent)
+
+                parent = parent.parent
 
     for p in paths:
         makefile(os.path.join(str(p), "__init__.py"))
+
+
+class LRUCache(OrderedDict):
+    """Dict which drops the least recently used items beyond `maxsize`."""
+
+    def __init__(self, maxsize: int = 128):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
@@ -0,0 +1,75 @@
+import os
+from typing import Dict
+from typing import List as LIST
+from typing import Optional, Tuple
+
+from .discovery import Discovery
+from .model import ModuleIO
+
+Stamp = Optional[Tuple[int, int]]
+
+
+def stamp(path: str) -> Stamp:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    return st.st_mtime_ns, st.st_size
+
+
+class Watcher:
+    """Poll the files of a package and report the modules changed in between.
+
+    Directories are stat-ed on every poll, the package is only re-walked
+    when one of them changes (a module is added, removed or renamed).
+    """
+
+    def __init__(
+        self,
+        module: ModuleIO,
+        head: str = None,
+        resolve_imports=False,
+        discovery: Optional[Discovery] = None,
+    ):
+        self.module = module
+        self.head = head
+        self.resolve_imports = resolve_imports
+        self.discovery = Discovery(gitignore=False) if discovery is None else discovery
+        self._dirs: Dict[str, Stamp] = {}
+        self._files: Dict[str, Tuple[ModuleIO, Stamp]] = {}
+
+        self.scan()
+
+    def scan(self):
+        self._dirs = {}
+
+        if self.module.ispkg:
+            for dirpath, _, _ in self.discovery.walk(os.path.dirname(self.module.src)):
+                self._dirs[dirpath] = stamp(dirpath)
+
+        self._files = {
+            mod.src: (mod, stamp(mod.src))
+            for mod in self.module.iter_submodules(
+                self.head,
+                resolve_imports=self.resolve_imports,
+                discovery=self.discovery,
+            )
+        }
+
+    def poll(self) -> LIST[ModuleIO]:
+        previous = {src: st for src, (_, st) in self._files.items()}
+
+        if any(stamp(d) != st for d, st in self._dirs.items()):
+            self.scan()
+
+        else:
+            self._files = {
+                src: (mod, stamp(src)) for src, (mod, _) in self._files.items()
+            }
+
+        return [
+            mod
+            for src, (mod, st) in self._files.items()
+            if st is not None and previous.get(src) != st
+        ]
@@ -32,3 +32,104 @@ def sync_meta(c, tomlfile=None, metafile=None):
 
     with open(metafile, "w") as f:
         f.write(content)
+
+
+@task(
+    help=dict(
+        modules="Number of synthetic modules, default: 100",
+        functions="Functions per module, default: 10",
+        classes="Classes per module, default: 5",
+        methods="Methods per class, default: 5",
+        changed="Modules modified before the partial-update run, default: 5",
+        repeat="Repetitions of the no-op runs, the fastest is kept, default: 3",
+        args='Extra options passed to gutt, e.g. "-j 4"',
+        outdir="Directory to store results, default: benchmarks/results",
+    )
+)
+def bench(
+    c,
+    modules=100,
+    functions=10,
+    classes=5,
+    methods=5,
+    changed=5,
+    repeat=3,
+    args="",
+    outdir=None,
+):
+    """Benchmark gutt end to end on a synthetic package and store the results"""
+
+    import glob
+    import json
+    import time
+
+    from benchmarks.synthetic import benchmark
+
+    project_root = os.path.dirname(__file__)
+    outdir = outdir or os.path.join(project_root, "benchmarks", "results")
+
+    result = benchmark(
+        modules=int(modules),
+        functions=int(functions),
+        classes=int(classes),
+        methods=int(methods),
+        changed=int(changed),
+        repeat=int(repeat),
+        extra_args=args.split(),
+    )
+
+    commit = c.run("git rev-parse --short HEAD", hide=True, warn=True).stdout.strip()
+    result.update(commit=commit, version=PACKAGE_VERSION)
+
+    previous = None
+    for path in sorted(glob.glob(os.path.join(outdir, "*.json"))):
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        if data.get("config") == result["config"]:
+            previous = data
+
+    for name, scenario in result["scenarios"].items():
+        line = f"{name:<24}{scenario['wall']:>10.3f}s"
+
+        if previous and name in previous["scenarios"]:
+            before = previous["scenarios"][name]["wall"]
+            line += f"  ({(scenario['wall'] - before) / before:+.1%} vs {previous['commit']})"
+
+        print(line)
+
+    os.makedirs(outdir, exist_ok=True)
+    fname = f"{time.strftime('%Y%m%dT%H%M%S')}-{commit or 'unknown'}.json"
+
+    with open(os.path.join(outdir, fname), "w") as f:
+        json.dump(result, f, indent=2)
+
+
+@task(
+    help=dict(
+        module="Module to import, default: gutt.cli.main",
+        budget="Startup budget in milliseconds, default: 150",
+        repeat="Repetitions, the fastest is kept, default: 5",
+    )
+)
+def importtime(c, module="gutt.cli.main", budget=150, repeat=5):
+    """Check the import time of the CLI against a startup budget"""
+
+    from invoke import Exit
+
+    from benchmarks.importtime import importtime as measure
+
+    result = measure(module, repeat=int(repeat))
+    total = result["total_us"] / 1000
+
+    top = sorted(result["imported"].items(), key=lambda kv: kv[1], reverse=True)
+    for name, us in top[:10]:
+        print(f"{name:<40}{us / 1000:>10.1f}ms")
+
+    print(f"\nimport {module}: {total:.1f}ms, budget: {float(budget):.1f}ms")
+
+    if result["heavy"]:
+        raise Exit(f"heavy modules imported at startup: {result['heavy']}", code=1)
+
+    if total > float(budget):
+        raise Exit(f"import time over budget: {total:.1f}ms", code=1)
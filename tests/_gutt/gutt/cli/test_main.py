@@ -26,3 +26,33 @@ def test_main():
     from gutt.cli.main import main
 
     assert main
+
+
+def test__init_worker():
+    from gutt.cli.main import _init_worker
+
+    assert _init_worker
+
+
+def test__generate_in_worker():
+    from gutt.cli.main import _generate_in_worker
+
+    assert _generate_in_worker
+
+
+def test__load_template():
+    from gutt.cli.main import _load_template
+
+    assert _load_template
+
+
+def test_read_modnames():
+    from gutt.cli.main import read_modnames
+
+    assert read_modnames
+
+
+def test__worker_template():
+    from gutt.cli.main import _worker_template
+
+    assert _worker_template
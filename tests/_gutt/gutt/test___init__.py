@@ -0,0 +1,4 @@
+def test___getattr__():
+    from gutt import __getattr__
+
+    assert __getattr__
@@ -0,0 +1,60 @@
+class TestChangesError:
+    @classmethod
+    def setup_class(cls):
+        from gutt.changes import ChangesError
+
+        assert ChangesError
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+
+def test_git_changed_files(tmp_path):
+    import subprocess
+
+    from gutt.changes import git_changed_files
+
+    def git(*args):
+        subprocess.run(("git", *args), cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q")
+    (tmp_path / ".gitignore").write_text("ignored.py\n")
+    (tmp_path / "old.py").write_text("")
+    git("add", ".")
+    git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "init")
+
+    (tmp_path / "old.py").write_text("x = 1\n")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "new.py").write_text("")
+    (tmp_path / "ignored.py").write_text("")
+
+    # NOTE: untracked modules count as changed, ignored ones don't
+    assert sorted(git_changed_files("HEAD", cwd=str(tmp_path / "sub"))) == [
+        str(tmp_path.resolve() / "old.py"),
+        str(tmp_path.resolve() / "sub" / "new.py"),
+    ]
+
+
+def test_read_changed_files():
+    from gutt.changes import read_changed_files
+
+    assert read_changed_files
+
+
+def test_changed_modules():
+    from gutt.changes import changed_modules
+
+    assert changed_modules
+
+
+def test_orphaned_tests():
+    from gutt.changes import orphaned_tests
+
+    assert orphaned_tests
@@ -0,0 +1,79 @@
+class TestRule:
+    @classmethod
+    def setup_class(cls):
+        from gutt.discovery import Rule
+
+        assert Rule
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_match(self):
+        pass
+
+
+def test__translate():
+    from gutt.discovery import _translate
+
+    assert _translate
+
+
+def test_parse_rules():
+    from gutt.discovery import parse_rules
+
+    assert parse_rules
+
+
+def test__read_rules():
+    from gutt.discovery import _read_rules
+
+    assert _read_rules
+
+
+def test__ignored():
+    from gutt.discovery import _ignored
+
+    assert _ignored
+
+
+class TestDiscovery:
+    @classmethod
+    def setup_class(cls):
+        from gutt.discovery import Discovery
+
+        assert Discovery
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test__root_rules(self):
+        pass
+
+    def test__dir_rules(self):
+        pass
+
+    def test__pruned_dir(self):
+        pass
+
+    def test__skipped_file(self):
+        pass
+
+    def test_walk(self):
+        pass
+
+    def test_skipped(self):
+        pass
@@ -0,0 +1,53 @@
+def test__normalize():
+    from gutt.filters import _normalize
+
+    assert _normalize
+
+
+def test__translate():
+    from gutt.filters import _translate
+
+    assert _translate
+
+
+def test_compile_patterns():
+    from gutt.filters import QualnameFilter
+
+    # NOTE: inline flags and backreferences work per pattern
+    qfilter = QualnameFilter(excludes=["(?i)private", r"(x)\1", r"(a)\1"])
+
+    assert qfilter.excluded("m.PRIVATE_thing")
+    assert qfilter.excluded("m.aa")
+    assert not qfilter.excluded("m.ab")
+    assert QualnameFilter(includes=["glob:m.f*"]).accepts("m.func")
+    assert not QualnameFilter(includes=["glob:m.f*"]).accepts("n.m.func")
+
+
+class TestQualnameFilter:
+    @classmethod
+    def setup_class(cls):
+        from gutt.filters import QualnameFilter
+
+        assert QualnameFilter
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_excluded(self):
+        pass
+
+    def test_accepts(self):
+        pass
+
+
+def test__search():
+    from gutt.filters import _search
+
+    assert _search
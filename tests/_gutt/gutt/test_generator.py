@@ -0,0 +1,130 @@
+class TestGenerationError:
+    @classmethod
+    def setup_class(cls):
+        from gutt.generator import GenerationError
+
+        assert GenerationError
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+
+class TestMessages:
+    @classmethod
+    def setup_class(cls):
+        from gutt.generator import Messages
+
+        assert Messages
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_secho(self):
+        pass
+
+    def test_render(self):
+        pass
+
+
+def test__parse_file():
+    from gutt.generator import _parse_file
+
+    assert _parse_file
+
+
+def test_generate_module():
+    from gutt.generator import generate_module
+    from gutt.model import ModuleIO
+    from gutt.template import AssertSelfTemplate
+
+    mod = ModuleIO(name="m", outdir="out", src="m.py", dst="out/test_m.py")
+    existing = (
+        "def test_f1():\n"
+        "    pass\n"
+        "\n"
+        "\n"
+        "def test_f1_handles_none():\n"
+        "    pass\n"
+        "\n"
+        "\n"
+        "def test_f2():\n"
+        "    pass\n"
+    )
+
+    result = generate_module(
+        mod,
+        AssertSelfTemplate,
+        formatter="none",
+        source="def f1(): pass\n",
+        existing=existing,
+        stale="prune",
+        generated=("m.f1", "m.f2"),
+    )
+
+    # NOTE: only the template gutt generated goes, hand-written tests stay
+    assert result.source == existing[: existing.index("\n\n\ndef test_f2")] + "\n"
+    assert result.stale == ("test_f1_handles_none",)
+    assert result.qualnames == ("m.f1",)
+
+    # NOTE: a test written before gutt ran is not recorded as generated
+    result = generate_module(
+        mod,
+        AssertSelfTemplate,
+        formatter="none",
+        source="def f1(): pass\nclass K:\n    def m(self): pass\n",
+        existing=existing,
+    )
+
+    assert result.qualnames == ("m.K", "m.K.m")
+
+    # NOTE: a class body on its header line goes through libcst
+    result = generate_module(
+        mod,
+        AssertSelfTemplate,
+        formatter="inproc",
+        source="class K:\n    def m1(self): pass\n",
+        existing="class TestK: pass\n",
+    )
+
+    assert (
+        result.source
+        == "class TestK:\n    pass\n\n    def test_m1(self):\n        pass\n"
+    )
+
+    class CSTTemplate(AssertSelfTemplate):
+        backend = "cst"
+
+    # NOTE: lines black would wrap are left to libcst and black
+    source = f"def f(): pass\nclass K:\n    def {'m' * 90}(self): pass\n"
+    results = [
+        generate_module(mod, Tmpl, formatter="inproc", source=source, existing="")
+        for Tmpl in (AssertSelfTemplate, CSTTemplate)
+    ]
+
+    assert results[0].source == results[1].source
+
+
+def test_generate():
+    from gutt.generator import generate
+
+    assert generate
+
+
+def test_generate_batch():
+    from gutt.generator import generate_batch
+
+    assert generate_batch
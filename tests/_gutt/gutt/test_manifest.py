@@ -0,0 +1,88 @@
+def test_filehash():
+    from gutt.manifest import filehash
+
+    assert filehash
+
+
+class TestFileState:
+    @classmethod
+    def setup_class(cls):
+        from gutt.manifest import FileState
+
+        assert FileState
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_from_path(self):
+        pass
+
+    def test_same_stat(self):
+        pass
+
+
+class TestEntry:
+    @classmethod
+    def setup_class(cls):
+        from gutt.manifest import Entry
+
+        assert Entry
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+
+class TestManifest:
+    @classmethod
+    def setup_class(cls):
+        from gutt.manifest import Manifest
+
+        assert Manifest
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_load(self):
+        pass
+
+    def test__key(self):
+        pass
+
+    def test__check(self):
+        pass
+
+    def test_is_fresh(self):
+        pass
+
+    def test_update(self):
+        pass
+
+    def test_save(self):
+        pass
+
+    def test_tracks(self):
+        pass
+
+    def test_qualnames(self):
+        pass
@@ -0,0 +1,267 @@
+def test_strip_prefix():
+    from gutt.merge import strip_prefix
+
+    assert strip_prefix
+
+
+class TestTestModule:
+    @classmethod
+    def setup_class(cls):
+        from gutt.merge import TestModule
+
+        assert TestModule
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_index(self):
+        pass
+
+    def test_methods(self):
+        pass
+
+    def test_qualnames(self):
+        from gutt.merge import TestModule
+
+        test_mod = TestModule(
+            "def helper(): pass\n"
+            "def test_f(): pass\n"
+            "class TestK:\n"
+            "    def setup_method(self, method): pass\n"
+            "    def test_m(self): pass\n"
+        )
+
+        assert test_mod.qualnames("m", "test_", "Test", "test_") == {
+            "m.helper",
+            "m.f",
+            "m.K",
+            "m.K.setup_method",
+            "m.K.m",
+        }
+
+
+SOURCES = [
+    "import os\n\n\nclass TestK:\n    def test_a(self):\n        pass\n",
+    # NOTE: no newline at the end
+    "class TestK:\n    def test_a(self):\n        pass",
+    "class TestK:\n"
+    "    def test_a(self):\n"
+    "        pass\n"
+    "\n"
+    "    # end of class\n"
+    "\n"
+    "\n"
+    "# end of file\n",
+    "",
+]
+METHOD = "def test_b(self):\n    pass\n"
+NODE = "def test_f():\n    from m import f\n    pass\n"
+
+
+def _classes(test_mod):
+    import ast
+
+    return [node for node in test_mod.body if isinstance(node, ast.ClassDef)]
+
+
+def test_splice():
+    from gutt.merge import Stale, TestModule, format_snippets, merge_cst, splice
+    from gutt.utils import blacking
+
+    def black(code):
+        return blacking(code, formatter="inproc")
+
+    for source in SOURCES:
+        test_mod = TestModule(source)
+        methods = [(cls, [METHOD]) for cls in _classes(test_mod)]
+        expected = black(
+            merge_cst(source, [(cls.name, texts) for cls, texts in methods], [NODE])
+        )
+
+        assert black(splice(test_mod, methods, [NODE])) == expected, source
+
+        method_texts, node_texts = format_snippets(
+            [METHOD] * len(methods), [NODE], black
+        )
+        spaced = splice(
+            test_mod,
+            [(cls, [text]) for (cls, _), text in zip(methods, method_texts)],
+            node_texts,
+            spaced=True,
+        )
+
+        # NOTE: black clean sources come out the same as formatting the whole file
+        if source.endswith("\n"):
+            assert spaced == expected, source
+
+    # NOTE: an emptied test class is left with a "pass"
+    test_mod = TestModule(SOURCES[0])
+    cls = _classes(test_mod)[0]
+    stale = Stale("TestK.test_a", "m.K.a", cls.body[0], cls)
+
+    assert splice(test_mod, [], [], remove=[stale]) == (
+        "import os\n\n\nclass TestK:\n    pass\n"
+    )
+
+    # NOTE: a class body on its header line is left to merge_cst
+    test_mod = TestModule("class TestK: pass\n")
+    assert splice(test_mod, [(_classes(test_mod)[0], [METHOD])], []) is None
+
+
+def test_merge_cst():
+    from gutt.merge import merge_cst
+
+    assert merge_cst("class TestK: pass\n", [("TestK", [METHOD])], [NODE]) == (
+        "class TestK:\n"
+        "    pass\n"
+        "    def test_b(self):\n"
+        "        pass\n"
+        "def test_f():\n"
+        "    from m import f\n"
+        "    pass\n"
+    )
+
+    source = (
+        "def test_a():\n    pass\nclass TestK:\n    def test_m(self):\n        pass\n"
+    )
+
+    assert merge_cst(source, [], [], remove=["test_a", "TestK.test_m"]) == (
+        "class TestK:\n    pass\n"
+    )
+
+
+def test__reindent():
+    from gutt.merge import _reindent
+
+    assert _reindent
+
+
+class TestStale:
+    @classmethod
+    def setup_class(cls):
+        from gutt.merge import Stale
+
+        assert Stale
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+
+def test__pass_line():
+    from gutt.merge import _pass_line
+
+    assert _pass_line
+
+
+def test_find_stale():
+    from gutt.merge import TestModule, find_stale
+    from gutt.scanner import scan
+
+    symbols = scan("def f1(): pass\nclass K:\n    def m1(self): pass\n", "m")
+    test_mod = TestModule(
+        "import os\n"
+        "def helper(): pass\n"
+        "def test_f1(): pass\n"
+        "def test_f1_handles_none(): pass\n"
+        "def test_f2(): pass\n"
+        "class TestK:\n"
+        "    def setup_method(self, method): pass\n"
+        "    def test_m1(self): pass\n"
+        "    def test_m2(self): pass\n"
+        "class TestGone:\n"
+        "    def test_m1(self): pass\n"
+    )
+
+    stale = find_stale(test_mod, symbols, "m", "test_", "Test", "test_")
+
+    assert [(s.name, s.qualname) for s in stale] == [
+        ("test_f1_handles_none", "m.f1_handles_none"),
+        ("test_f2", "m.f2"),
+        ("TestK.test_m2", "m.K.m2"),
+        ("TestGone", "m.Gone"),
+    ]
+    assert stale[2].parent is test_mod.body[5]
+
+
+def test__drop_lines():
+    from gutt.merge import Stale, TestModule, _drop_lines
+
+    test_mod = TestModule(
+        "def test_a():\n"
+        "    pass\n"
+        "\n"
+        "\n"
+        "@mark\n"
+        "def test_b():\n"
+        "    pass\n"
+    )
+    node = test_mod.body[1]
+
+    # NOTE: the blank lines above go along
+    drop = _drop_lines(test_mod.lines, [Stale("test_b", "m.b", node)])
+
+    assert drop == set(range(2, 7))
+
+
+def test_render():
+    from gutt.merge import render
+
+    assert render
+
+
+def test__segment():
+    from gutt.merge import _segment
+
+    assert _segment
+
+
+def test_format_snippets():
+    from gutt.merge import format_snippets
+
+    assert format_snippets
+
+
+def test_prunable():
+    from gutt.merge import TestModule, find_stale, prunable
+
+    test_mod = TestModule(
+        "def test_f(): pass\n"
+        "def test_g(): pass\n"
+        "class TestK:\n"
+        "    def setup_method(self, method): pass\n"
+        "    def test_m(self): pass\n"
+        "    def test_custom(self): pass\n"
+        "class TestL:\n"
+        "    def setup_method(self, method): pass\n"
+        "    def test_m(self): pass\n"
+        "class TestN:\n"
+        "    def test_m(self): pass\n"
+    )
+    stale = find_stale(test_mod, {}, "m", "test_", "Test", "test_")
+    generated = {"m.f", "m.K", "m.K.m", "m.L", "m.L.m", "m.N.m"}
+
+    remove, dropped = prunable(stale, generated, "test_")
+
+    # NOTE: hand-written members keep their class alive
+    assert [item.name for item in remove] == [
+        "test_f",
+        "TestK.setup_method",
+        "TestK.test_m",
+        "TestL",
+        "TestN",
+    ]
+    assert dropped == generated | {"m.K.setup_method", "m.L.setup_method", "m.N"}
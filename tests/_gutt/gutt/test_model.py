@@ -24,6 +24,18 @@ class TestModuleIO:
     def test_ispkg(self):
         pass
 
+    def test_iter_submodules(self):
+        pass
+
+    def test_from_path(self):
+        pass
+
+    def test_locate(self):
+        pass
+
+    def test_submodule(self):
+        pass
+
 
 class TestCode:
     @classmethod
@@ -41,3 +53,102 @@ class TestCode:
 
     def teardown_method(self, method):
         pass
+
+    def test_name(self):
+        pass
+
+    def test_cst(self):
+        from gutt.model import Code, ModuleIO
+        from gutt.scanner import scan, splitlines
+
+        source = "class K:\n    def m1(self): pass\n    def m2(self): pass\n"
+        mod = ModuleIO(name="m", outdir="out", src="m.py", dst="out/test_m.py")
+        code = Code(mod, scan(source, "m")["m.K"], splitlines(source))
+
+        # NOTE: parsed once, methods pick their node from the class
+        assert code.cst is code.cst
+        assert code.method("m2").cst is code.cst.body.body[1]
+
+    def test_method(self):
+        pass
+
+    def test_evolve(self):
+        from libcst import FunctionDef
+
+        from gutt.merge import render
+        from gutt.model import Code, ModuleIO
+        from gutt.scanner import scan, splitlines
+        from gutt.template import ClassLayout, MethodLayout
+
+        # NOTE: a custom layout written against the former `Code` records
+        class LegacyMethodLayout(MethodLayout):
+            @property
+            def name(self):
+                return self._code.cst.name.with_changes(
+                    value=f"check_{self._code.name}"
+                )
+
+        class LegacyClassLayout(ClassLayout):
+            method_layout = LegacyMethodLayout
+
+            @property
+            def methods(self):
+                return [
+                    self.method_layout(self._code.evolve(cst=stmt)).build()
+                    for stmt in self._code.cst.body.body
+                    if isinstance(stmt, FunctionDef)
+                ]
+
+        source = "class K:\n    def m1(self): pass\n"
+        mod = ModuleIO(name="m", outdir="out", src="m.py", dst="out/test_m.py")
+        symbol = scan(source, "m")["m.K"]
+
+        for code in (
+            Code(mod, symbol, splitlines(source)),
+            Code(module=mod, cst=Code(mod, symbol, splitlines(source)).cst),
+        ):
+            assert "    def check_m1(self):\n" in render(
+                LegacyClassLayout(code).build()
+            )
+
+
+class TestGenerated:
+    @classmethod
+    def setup_class(cls):
+        from gutt.model import Generated
+
+        assert Generated
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_failed(self):
+        pass
+
+
+class TestSymbol:
+    @classmethod
+    def setup_class(cls):
+        from gutt.model import Symbol
+
+        assert Symbol
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_method(self):
+        pass
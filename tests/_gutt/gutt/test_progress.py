@@ -0,0 +1,133 @@
+class TestProgress:
+    @classmethod
+    def setup_class(cls):
+        from gutt.progress import Progress
+
+        assert Progress
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_write(self):
+        pass
+
+    def test_flush(self):
+        pass
+
+    def test_secho(self):
+        pass
+
+    def test_start(self):
+        pass
+
+    def test_messages(self):
+        pass
+
+    def test_done(self):
+        pass
+
+    def test_finish(self):
+        pass
+
+
+class TestLineProgress:
+    @classmethod
+    def setup_class(cls):
+        from gutt.progress import LineProgress
+
+        assert LineProgress
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+
+class TestSummaryProgress:
+    @classmethod
+    def setup_class(cls):
+        from gutt.progress import SummaryProgress
+
+        assert SummaryProgress
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_summary(self):
+        pass
+
+    def test_finish(self):
+        pass
+
+
+class TestBarProgress:
+    @classmethod
+    def setup_class(cls):
+        from gutt.progress import BarProgress
+
+        assert BarProgress
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_bar(self):
+        pass
+
+    def test_draw(self):
+        pass
+
+    def test_messages(self):
+        pass
+
+    def test_done(self):
+        pass
+
+    def test_finish(self):
+        pass
+
+
+class TestQuietProgress:
+    @classmethod
+    def setup_class(cls):
+        from gutt.progress import QuietProgress
+
+        assert QuietProgress
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_write(self):
+        pass
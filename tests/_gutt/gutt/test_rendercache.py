@@ -0,0 +1,67 @@
+class TestSnippet:
+    @classmethod
+    def setup_class(cls):
+        from gutt.rendercache import Snippet
+
+        assert Snippet
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+
+def test__format_config():
+    from gutt.rendercache import _format_config
+
+    assert _format_config
+
+
+def test_render_key():
+    from gutt.rendercache import render_key
+
+    assert render_key
+
+
+class TestRenderCache:
+    @classmethod
+    def setup_class(cls):
+        from gutt.rendercache import RenderCache
+
+        assert RenderCache
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_load(self):
+        pass
+
+    def test_get(self):
+        pass
+
+    def test__store(self):
+        pass
+
+    def test_put(self):
+        pass
+
+    def test_update(self):
+        pass
+
+    def test_drain(self):
+        pass
+
+    def test_save(self):
+        pass
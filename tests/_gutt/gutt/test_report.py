@@ -0,0 +1,55 @@
+class TestStats:
+    @classmethod
+    def setup_class(cls):
+        from gutt.report import Stats
+
+        assert Stats
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_phase(self):
+        pass
+
+    def test_count(self):
+        pass
+
+    def test_merge(self):
+        pass
+
+    def test_to_dict(self):
+        pass
+
+
+class TestRunReport:
+    @classmethod
+    def setup_class(cls):
+        from gutt.report import RunReport
+
+        assert RunReport
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_add(self):
+        pass
+
+    def test_to_dict(self):
+        pass
+
+    def test_to_json(self):
+        pass
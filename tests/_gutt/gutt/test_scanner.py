@@ -0,0 +1,35 @@
+def test__span():
+    from gutt.scanner import _span
+
+    assert _span
+
+
+def test_scan():
+    from gutt.scanner import scan
+
+    assert scan
+
+
+def test_splitlines():
+    from gutt.scanner import splitlines
+
+    assert splitlines
+
+
+def test_load_cst():
+    from gutt.scanner import load_cst
+
+    assert load_cst
+
+
+def test__source_segment():
+    import ast
+
+    from gutt.scanner import _source_segment, splitlines
+
+    source = "@a . b ( 'ü' )  # c\n@x.y(1,\n  'é', b=[2])\ndef f(): pass\n"
+    decorators = ast.parse(source).body[0].decorator_list
+
+    assert [_source_segment(splitlines(source), d) for d in decorators] == [
+        ast.get_source_segment(source, d) for d in decorators
+    ]
@@ -0,0 +1,82 @@
+class TestRPCError:
+    @classmethod
+    def setup_class(cls):
+        from gutt.server import RPCError
+
+        assert RPCError
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+
+def test_modname_from_path():
+    from gutt.server import modname_from_path
+
+    assert modname_from_path
+
+
+def test__error():
+    from gutt.server import _error
+
+    assert _error
+
+
+class TestServer:
+    @classmethod
+    def setup_class(cls):
+        from gutt.server import Server
+
+        assert Server
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test__resolve(self):
+        pass
+
+    def test__head(self):
+        pass
+
+    def test__run(self):
+        pass
+
+    def test_generate(self):
+        pass
+
+    def test_generate_files(self):
+        pass
+
+    def test_ping(self):
+        pass
+
+    def test_shutdown(self):
+        pass
+
+    def test__dispatch(self):
+        pass
+
+    def test_handle(self):
+        pass
+
+    def test_handle_line(self):
+        pass
+
+    def test_serve_stdio(self):
+        pass
+
+    def test_serve_unix(self):
+        pass
@@ -16,8 +16,66 @@ class TestLayout:
         pass
 
     def test_build(self):
+        from gutt.merge import render
+        from gutt.model import Code, ModuleIO
+        from gutt.scanner import scan
+        from gutt.template import FunctionLayout, _decorator
+
+        class MarkedLayout(FunctionLayout):
+            def __init__(self, code):
+                super().__init__(code)
+                self.decorators = [_decorator("slow")]
+
+        symbol = scan("def f(): pass\n", "m")["m.f"]
+        mod = ModuleIO(name="m", outdir="out", src="m.py", dst="out/test_m.py")
+        code = Code(module=mod, symbol=symbol, lines=[])
+
+        assert render(MarkedLayout(code).build()).startswith("@slow\ndef test_f():")
+
+    def test_text_fields(self):
         pass
 
+    def test_text(self):
+        from gutt.merge import format_snippets, render
+        from gutt.model import CLASS, Code, ModuleIO
+        from gutt.scanner import scan
+        from gutt.template import AssertFalseTemplate, AssertSelfTemplate, Template
+        from gutt.utils import blacking
+
+        source = (
+            "def f(): pass\n"
+            "class K:\n"
+            "    def __init__(self): pass\n"
+            "    def m1(self): pass\n"
+            "    async def m2(self): pass\n"
+            "class Empty: pass\n"
+        )
+        mod = ModuleIO(name="pkg.m", outdir="out", src="m.py", dst="out/test_m.py")
+
+        def black(code):
+            return blacking(code, formatter="inproc")
+
+        for Tmpl in (Template, AssertSelfTemplate, AssertFalseTemplate):
+            for symbol in scan(source, mod.name).values():
+                code = Code(module=mod, symbol=symbol, lines=[])
+
+                if symbol.kind == CLASS:
+                    layout = Tmpl.class_layout
+                    method = code.method("m1")
+                    text = layout.method_layout(method).text()
+                    cst = render(layout.method_layout(method).build())
+
+                    # NOTE: same text as formatting the libcst output
+                    assert [text] == format_snippets([cst], [], black)[0]
+
+                else:
+                    layout = Tmpl.function_layout
+
+                text = layout(code).text()
+                cst = render(layout(code).build())
+
+                assert [text] == format_snippets([], [cst], black)[1], (Tmpl, symbol)
+
 
 class TestFunctionLayout:
     @classmethod
@@ -105,6 +163,12 @@ class TestClassLayout:
     def test_body(self):
         pass
 
+    def test__method_layouts(self):
+        pass
+
+    def test_text_fields(self):
+        pass
+
 
 class TestTemplate:
     @classmethod
@@ -245,3 +309,39 @@ class TestAssertSelfTemplate:
 
 
 pass
+
+
+def test__layout_fields():
+    from gutt.template import _layout_fields
+
+    assert _layout_fields
+
+
+def test__module_expr():
+    from gutt.template import _module_expr
+
+    assert _module_expr
+
+
+def test__params():
+    from gutt.template import _params
+
+    assert _params
+
+
+def test__decorator():
+    from gutt.template import _decorator
+
+    assert _decorator
+
+
+def test__pass_block():
+    from gutt.template import _pass_block
+
+    assert _pass_block
+
+
+def test__fixture():
+    from gutt.template import _fixture
+
+    assert _fixture
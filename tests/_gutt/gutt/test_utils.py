@@ -80,3 +80,81 @@ class TestSerializable:
 
     def test_mutate_from_other(self):
         pass
+
+
+def test__black_mode():
+    from gutt.utils import _black_mode
+
+    assert _black_mode
+
+
+def test__isort_config():
+    from gutt.utils import _isort_config
+
+    assert _isort_config
+
+
+def test__pipe_through():
+    from gutt.utils import _pipe_through
+
+    assert _pipe_through
+
+
+def test__samecontent():
+    from gutt.utils import _samecontent
+
+    assert _samecontent
+
+
+def test__umask():
+    from gutt.utils import _umask
+
+    assert _umask
+
+
+class TestWriteQueue:
+    @classmethod
+    def setup_class(cls):
+        from gutt.utils import WriteQueue
+
+        assert WriteQueue
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_put(self):
+        pass
+
+    def test_flush(self):
+        pass
+
+
+class TestLRUCache:
+    @classmethod
+    def setup_class(cls):
+        from gutt.utils import LRUCache
+
+        assert LRUCache
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+
+def test_text_width():
+    from gutt.utils import text_width
+
+    assert text_width
@@ -0,0 +1,28 @@
+def test_stamp():
+    from gutt.watcher import stamp
+
+    assert stamp
+
+
+class TestWatcher:
+    @classmethod
+    def setup_class(cls):
+        from gutt.watcher import Watcher
+
+        assert Watcher
+
+    @classmethod
+    def teardown_class(cls):
+        pass
+
+    def setup_method(self, method):
+        pass
+
+    def teardown_method(self, method):
+        pass
+
+    def test_scan(self):
+        pass
+
+    def test_poll(self):
+        pass